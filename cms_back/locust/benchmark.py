@@ -0,0 +1,345 @@
+"""
+Suite de benchmarks de regresión para la API del CMS
+----------------------------------------------------
+
+Corre una matriz fija de escenarios en modo headless, guarda p50/p95/p99 e
+histograma de latencias por endpoint ("List Appointments", "Dashboard
+Charts", "List Audit Logs", ...) y compara contra un baseline versionado.
+Si algún endpoint empeora más allá del umbral, termina con código 1, así
+sirve como gate en CI antes de llegar a producción.
+
+Uso:
+
+    # Primera vez: generar el baseline
+    python benchmark.py run --host http://localhost:5000 --update-baseline
+
+    # Corridas siguientes: comparar y fallar si hay regresión
+    python benchmark.py run --host http://localhost:5000 --threshold 0.2
+
+    # Comparar dos resultados ya guardados
+    python benchmark.py compare baselines/baseline.json results/latest.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from server_metrics import attach_queries
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOCUSTFILE = os.path.join(HERE, "locustfile.py")
+BASELINE_DIR = os.path.join(HERE, "baselines")
+RESULTS_DIR = os.path.join(HERE, "results")
+SCHEMA_VERSION = 1
+PERCENTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+# Matriz fija: mismos usuarios, tasa, duración y semilla en todas las corridas
+SCENARIOS = {
+    "smoke": {"users": 10, "spawn_rate": 5, "run_time": "1m"},
+    "steady": {"users": 50, "spawn_rate": 10, "run_time": "3m"},
+    "peak": {"users": 200, "spawn_rate": 20, "run_time": "3m"},
+    # Mayormente búsquedas (SearchUser); correr sobre una base sembrada a escala
+    "search": {"users": 50, "spawn_rate": 10, "run_time": "3m",
+               "env": {"LOCUST_SEARCH_WEIGHT": "100"}},
+    # Sube la tasa hasta romper el SLO y guarda el máximo RPS sostenible;
+    # solo corre si se pide con --scenarios capacity (ver load_shapes.py)
+    "capacity": {"env": {"LOCUST_SHAPE": "capacity"}, "opt_in": True},
+}
+BENCHMARK_SEED = 1234
+
+
+# ============================================================
+# 1. Reporte por endpoint (se llama desde locustfile.py)
+# ============================================================
+
+def entry_report(entry):
+    """Métricas de un StatsEntry de Locust, incluyendo el histograma crudo."""
+    report = {
+        "method": entry.method,
+        "name": entry.name,
+        "requests": entry.num_requests,
+        "failures": entry.num_failures,
+        "avg_ms": round(entry.avg_response_time, 2),
+        "max_ms": entry.max_response_time,
+        "rps": round(entry.total_rps, 2),
+        "histogram": {str(ms): count for ms, count in sorted(entry.response_times.items())},
+    }
+    for label, fraction in PERCENTILES.items():
+        report[f"{label}_ms"] = entry.get_response_time_percentile(fraction) if entry.num_requests else 0
+    return report
+
+
+def write_report(environment, path, server=None, endpoint_urls=None, generator=None, shape=None):
+    """Vuelca las estadísticas finales de la prueba a ``path`` (JSON).
+
+    Si se pasan las métricas de /health/metrics, cada endpoint incluye las
+    formas SQL más costosas de la ruta Express que lo atiende; ``generator``
+    es el resumen de CPU del generador (ver generator_cpu.py) y ``shape`` el
+    resultado del perfil de carga, p. ej. el máximo RPS sostenible.
+    """
+    endpoints = [
+        entry_report(entry)
+        for entry in environment.stats.entries.values()
+        if entry.num_requests
+    ]
+    attach_queries(endpoints, server, endpoint_urls or {})
+    report = {"host": environment.host, "endpoints": endpoints}
+    if server:
+        report["server"] = {"pool": server.get("pool"), "shapes": server.get("shapes")}
+    if generator:
+        report["generator"] = generator
+    if shape:
+        report["shape"] = shape
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Reporte de benchmark guardado en {path}")
+
+
+# ============================================================
+# 2. Ejecución de la matriz de escenarios
+# ============================================================
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=HERE, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_scenario(name, scenario, host, engine, extra_args):
+    fd, report_path = tempfile.mkstemp(prefix=f"bench-{name}-", suffix=".json")
+    os.close(fd)
+    command = [
+        sys.executable, "-m", "locust",
+        "-f", LOCUSTFILE,
+        "--headless",
+        "--only-summary",
+        "--host", host,
+        "--workload-seed", str(BENCHMARK_SEED),
+        "--benchmark-report", report_path,
+        *extra_args,
+    ]
+    if "users" in scenario:
+        command += ["-u", str(scenario["users"]), "-r", str(scenario["spawn_rate"]),
+                    "-t", scenario["run_time"]]
+        print(f"🚀 Escenario '{name}': {scenario['users']} usuarios durante {scenario['run_time']}")
+    else:
+        # Los perfiles de carga deciden usuarios y duración
+        print(f"🚀 Escenario '{name}': perfil {scenario['env']['LOCUST_SHAPE']}")
+    env = {**os.environ, **scenario.get("env", {}), "LOCUST_ENGINE": engine}
+    result = subprocess.run(command, cwd=HERE, env=env)
+    try:
+        with open(report_path, "r", encoding="utf-8") as f:
+            content = f.read()
+    finally:
+        os.remove(report_path)
+
+    # Locust sale con 1 si hubo fallas; eso lo decide la comparación, no el
+    # proceso. Cualquier otro código, o un reporte vacío, es que no terminó
+    if result.returncode not in (0, 1) or not content.strip():
+        missing = "" if content.strip() else " sin escribir el reporte de benchmark"
+        raise SystemExit(
+            f"❌ Escenario '{name}': Locust terminó con código {result.returncode}{missing}"
+        )
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        raise SystemExit(f"❌ Escenario '{name}': reporte de benchmark inválido ({e})")
+
+
+def run_matrix(host, scenario_names, engine, extra_args):
+    scenarios = {}
+    for name in scenario_names:
+        report = run_scenario(name, SCENARIOS[name], host, engine, extra_args)
+        scenarios[name] = {
+            "config": SCENARIOS[name],
+            "endpoints": report["endpoints"],
+            "generator": report.get("generator"),
+        }
+        if report.get("shape"):
+            scenarios[name]["shape"] = report["shape"]
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "host": host,
+        "seed": BENCHMARK_SEED,
+        "engine": engine,
+        "scenarios": scenarios,
+    }
+
+
+def save_results(results, json_path):
+    """Guarda el resultado como JSON (completo) y CSV (tabla plana)."""
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    csv_path = os.path.splitext(json_path)[0] + ".csv"
+    columns = ["scenario", "method", "name", "requests", "failures",
+               "p50_ms", "p95_ms", "p99_ms", "avg_ms", "max_ms", "rps"]
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for scenario, data in results["scenarios"].items():
+            for endpoint in data["endpoints"]:
+                writer.writerow({"scenario": scenario, **endpoint})
+    print(f"💾 Resultados guardados en {json_path} y {csv_path}")
+
+
+# ============================================================
+# 3. Comparación contra el baseline
+# ============================================================
+
+def failure_rate(endpoint):
+    return endpoint["failures"] / endpoint["requests"] if endpoint["requests"] else 0.0
+
+
+def compare(baseline, current, threshold, min_delta_ms, metrics, max_failure_increase):
+    """Devuelve la lista de regresiones (vacía si todo está dentro del umbral)."""
+    if baseline.get("schema_version") != SCHEMA_VERSION:
+        raise SystemExit(
+            f"❌ Baseline con schema_version {baseline.get('schema_version')}, "
+            f"se esperaba {SCHEMA_VERSION}; regenera con --update-baseline"
+        )
+    if baseline.get("engine", "http") != current.get("engine", "http"):
+        print(
+            f"⚠️ El baseline se generó con el motor '{baseline.get('engine', 'http')}' y esta "
+            f"corrida usa '{current.get('engine', 'http')}'; las latencias no son comparables"
+        )
+
+    regressions = []
+    for scenario, data in current["scenarios"].items():
+        base_scenario = baseline["scenarios"].get(scenario)
+        if not base_scenario:
+            print(f"⚠️ Escenario '{scenario}' no existe en el baseline, se omite")
+            continue
+
+        # En la búsqueda de capacidad las latencias son las del punto de quiebre;
+        # lo que se compara es el máximo RPS sostenible
+        if "shape" in data:
+            before = (base_scenario.get("shape") or {}).get("max_sustainable_rps")
+            after = data["shape"].get("max_sustainable_rps")
+            if before and after is not None and after < before * (1 - threshold):
+                regressions.append(f"{scenario}: máximo RPS sostenible {before} -> {after}")
+            continue
+
+        base_endpoints = {(e["method"], e["name"]): e for e in base_scenario["endpoints"]}
+
+        for endpoint in data["endpoints"]:
+            base = base_endpoints.get((endpoint["method"], endpoint["name"]))
+            if not base:
+                continue
+            label = f"{scenario} / {endpoint['method']} {endpoint['name']}"
+
+            # La forma SQL más costosa detrás del endpoint ayuda a ubicar la causa
+            queries = endpoint.get("queries") or []
+            hint = f"\n       SQL: {queries[0]['sql'][:120]}" if queries else ""
+
+            for metric in metrics:
+                before, after = base[f"{metric}_ms"], endpoint[f"{metric}_ms"]
+                if after - before > min_delta_ms and after > before * (1 + threshold):
+                    regressions.append(f"{label}: {metric} {before}ms -> {after}ms{hint}")
+
+            before, after = failure_rate(base), failure_rate(endpoint)
+            if after - before > max_failure_increase:
+                regressions.append(f"{label}: failures {before:.1%} -> {after:.1%}")
+    return regressions
+
+
+def report_comparison(regressions):
+    if not regressions:
+        print("✅ Sin regresiones contra el baseline")
+        return 0
+    print(f"❌ {len(regressions)} regresiones contra el baseline:")
+    for regression in regressions:
+        print(f"   - {regression}")
+    return 1
+
+
+# ============================================================
+# 4. CLI
+# ============================================================
+
+def add_gate_arguments(parser):
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Aumento relativo permitido en la latencia (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=10,
+                        help="Diferencia absoluta mínima para considerar regresión")
+    parser.add_argument("--metrics", default="p95,p99",
+                        help="Percentiles a vigilar, separados por coma (p50,p95,p99)")
+    parser.add_argument("--max-failure-increase", type=float, default=0.01,
+                        help="Aumento permitido en la tasa de fallas (0.01 = 1 punto)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de regresión de la API del CMS")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Correr la matriz y comparar contra el baseline")
+    run.add_argument("--host", required=True)
+    run.add_argument("--scenarios",
+                     default=",".join(n for n, s in SCENARIOS.items() if not s.get("opt_in")),
+                     help=f"Escenarios a correr ({', '.join(SCENARIOS)})")
+    run.add_argument("--baseline", default=os.path.join(BASELINE_DIR, "baseline.json"))
+    run.add_argument("--output", default=None,
+                     help="Archivo de resultados (por defecto results/<fecha>.json)")
+    run.add_argument("--update-baseline", action="store_true",
+                     help="Guardar esta corrida como el nuevo baseline")
+    run.add_argument("--engine", choices=["http", "fast"],
+                     default=os.environ.get("LOCUST_ENGINE", "http"),
+                     help="Motor HTTP de Locust (LOCUST_ENGINE); comparar siempre con el mismo")
+    add_gate_arguments(run)
+
+    check = commands.add_parser("compare", help="Comparar dos resultados guardados")
+    check.add_argument("baseline")
+    check.add_argument("current")
+    add_gate_arguments(check)
+
+    args, extra_args = parser.parse_known_args(argv)
+    metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+    unknown = set(metrics) - set(PERCENTILES)
+    if unknown:
+        parser.error(f"Percentiles desconocidos: {', '.join(sorted(unknown))}")
+
+    if args.command == "compare":
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, "r", encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            parser.error(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+        # Los argumentos no reconocidos se pasan tal cual a Locust
+        current = run_matrix(args.host, names, args.engine, extra_args)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        save_results(current, args.output or os.path.join(RESULTS_DIR, f"{stamp}.json"))
+
+        if args.update_baseline:
+            save_results(current, args.baseline)
+            return 0
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ No existe baseline en {args.baseline}; corre con --update-baseline")
+            return 0
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    regressions = compare(
+        baseline, current, args.threshold, args.min_delta_ms, metrics, args.max_failure_increase
+    )
+    return report_comparison(regressions)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
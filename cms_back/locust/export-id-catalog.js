@@ -0,0 +1,53 @@
+const fs = require("fs");
+const path = require("path");
+const { query } = require("../src/config/database");
+
+/**
+ * Script to export the real entity IDs of the database to id_catalog.json
+ * Run it after seeding so the Locust harness only requests IDs that exist.
+ */
+
+const ENTITIES = {
+  usuarios: "SELECT id FROM USUARIO ORDER BY id",
+  medicos: "SELECT id FROM MEDICO ORDER BY id",
+  pacientes: "SELECT id FROM PACIENTE ORDER BY id",
+  citas: "SELECT id FROM CITA ORDER BY id",
+  consultas: "SELECT id FROM CONSULTA ORDER BY id",
+};
+
+async function exportIdCatalog() {
+  try {
+    const outputPath = path.join(__dirname, "id_catalog.json");
+    const ids = {};
+
+    console.log("📖 Reading entity IDs from database...\n");
+
+    for (const [kind, sql] of Object.entries(ENTITIES)) {
+      const result = await query(sql);
+      ids[kind] = result.rows.map((row) => row.id);
+      console.log(`  📋 ${kind}: ${ids[kind].length} IDs`);
+    }
+
+    fs.writeFileSync(
+      outputPath,
+      JSON.stringify(
+        {
+          exported_at: new Date().toISOString(),
+          database: process.env.DB_NAME || "cms_medico",
+          ids,
+        },
+        null,
+        2
+      )
+    );
+
+    console.log(`\n✅ ID catalog written to ${outputPath}`);
+    process.exit(0);
+  } catch (error) {
+    console.error("❌ Fatal error:", error);
+    process.exit(1);
+  }
+}
+
+// Run the script
+exportIdCatalog();
@@ -0,0 +1,620 @@
+"""
+Generador de datos sintéticos a escala para los benchmarks
+----------------------------------------------------------
+
+Siembra la base con volúmenes realistas (miles de médicos, millones de
+citas, consultas y registros de auditoría) para que las pruebas de carga
+midan una base que no cabe en unas cuantas páginas de memoria.
+
+- Los datos se cargan con COPY en bloques (--chunk-size) repartidos entre
+  varios procesos (--workers); cada bloque es una transacción.
+- Son referencialmente consistentes: cada proceso calcula las llaves
+  foráneas de una fila con una función hash determinista de
+  (semilla, índice), sin consultar a la base ni a los otros procesos.
+- Los IDs se reservan avanzando las secuencias antes de cargar, así la
+  carga se puede repetir sobre una base con datos (se agregan filas).
+- El hash bcrypt de la contraseña se calcula una sola vez y se reutiliza
+  para todas las cuentas.
+- Al terminar escribe users.csv (cuentas para el harness) e
+  id_catalog.json (mismo formato que export-id-catalog.js).
+
+Uso:
+
+    pip install -r requirements-locust.txt
+
+    # 1x: ~20k pacientes, 100k citas, 300k registros de auditoría
+    python generate_data.py --scale 1x
+
+    # 100x con 8 procesos
+    python generate_data.py --scale 100x --workers 8
+
+La conexión usa las mismas variables que el backend (DB_HOST, DB_PORT,
+DB_NAME, DB_USER, DB_PASSWORD) o --dsn.
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import bcrypt
+import psycopg2
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Filas por tabla con --scale 1x
+BASE_COUNTS = {
+    "admins": 20,
+    "medicos": 500,
+    "pacientes": 20_000,
+    "citas": 100_000,
+    "consultas": 60_000,
+    "notificaciones": 100_000,
+    "archivos": 20_000,
+    "auditoria": 300_000,
+}
+
+# Catálogos de init-postgres.sql
+ROLES = {"admin": 1, "medico": 2, "paciente": 3}
+ESPECIALIDADES = 15
+TIPOS_SANGRE = 8
+OCUPACIONES = 8
+ESTADOS_CIVILES = 4
+ESTADOS_CITA = 5
+TIPOS_CITA = 4
+ESTADOS_CONSULTA = 3
+
+NOMBRES = [
+    "María", "José", "Juan", "Ana", "Luis", "Carmen", "Carlos", "Laura",
+    "Jorge", "Sofía", "Miguel", "Lucía", "Pedro", "Elena", "Fernando",
+    "Mariana", "Ricardo", "Gabriela", "Roberto", "Valeria", "Alejandro",
+    "Daniela", "Francisco", "Patricia", "Javier", "Marta", "Diego", "Rosa",
+]
+APELLIDOS = [
+    "García", "Hernández", "López", "Martínez", "González", "Pérez",
+    "Rodríguez", "Sánchez", "Ramírez", "Cruz", "Flores", "Gómez", "Morales",
+    "Vázquez", "Jiménez", "Reyes", "Díaz", "Torres", "Gutiérrez", "Ruiz",
+    "Mendoza", "Aguilar", "Ortiz", "Castillo", "Romero", "Álvarez",
+]
+DOMINIOS = ["example.com", "gmail.com", "hotmail.com", "clinica.mx"]
+CIUDADES = ["Monterrey, NL", "CDMX", "Guadalajara, JAL", "Puebla, PUE", "Querétaro, QRO"]
+DIAGNOSTICOS = [
+    "Hipertensión arterial", "Diabetes mellitus tipo 2", "Infección respiratoria aguda",
+    "Gastritis", "Lumbalgia", "Migraña", "Dermatitis", "Control de rutina",
+]
+TIPOS_ARCHIVO = ["pdf", "image", "dicom", "lab"]
+CANALES = ["EMAIL", "SMS", "PUSH"]
+ESTADOS_NOTIFICACION = ["ENVIADA", "PENDIENTE", "FALLIDA"]
+ACCIONES = ["CREATE", "UPDATE", "DELETE", "LOGIN"]
+
+# Las fechas de citas caen en los últimos 2 años y los próximos 60 días
+HISTORY_DAYS = 730
+FUTURE_DAYS = 60
+SLOT_MINUTES = 30
+
+
+# ============================================================
+# 1. Plan de carga: conteos, IDs reservados y llaves foráneas
+# ============================================================
+
+MASK = (1 << 64) - 1
+
+
+def mix(seed, stream, index):
+    """Hash entero determinista (splitmix64) de (semilla, flujo, índice)."""
+    x = (seed * 0x9E3779B97F4A7C15 + stream * 0xD1B54A32D192ED03 + index) & MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK
+    return x ^ (x >> 31)
+
+
+# Flujos independientes para cada llave foránea
+S_CITA_PACIENTE, S_CITA_MEDICO, S_CITA_FECHA = 1, 2, 3
+S_PACIENTE_MEDICO, S_NOTIF_CITA, S_ARCHIVO_ENTIDAD = 4, 5, 6
+S_AUDIT_USUARIO, S_AUDIT_ENTIDAD, S_ROWS = 7, 8, 9
+
+
+def parse_scale(value):
+    """'1x', '10x', '100x' o un número (0.1 = una décima parte)."""
+    try:
+        scale = float(value.lower().rstrip("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"escala inválida: {value}")
+    if scale <= 0:
+        raise argparse.ArgumentTypeError("la escala debe ser mayor que 0")
+    return scale
+
+
+class Plan:
+    """Todo lo que un proceso necesita para generar cualquier bloque."""
+
+    def __init__(self, scale, seed, password_hash, bases, now):
+        self.seed = seed
+        self.password_hash = password_hash
+        self.counts = {
+            kind: max(1, int(round(count * scale)))
+            for kind, count in BASE_COUNTS.items()
+        }
+        self.bases = bases
+        self.start = now - timedelta(days=HISTORY_DAYS)
+        self.slots = (HISTORY_DAYS + FUTURE_DAYS) * 24 * 60 // SLOT_MINUTES
+
+    @property
+    def users(self):
+        c = self.counts
+        return c["admins"] + c["medicos"] + c["pacientes"]
+
+    def table_counts(self):
+        c = self.counts
+        return {
+            "usuario": self.users,
+            "medico": c["medicos"],
+            "paciente": c["pacientes"],
+            "cita": c["citas"],
+            "consulta": c["consultas"],
+            "notificacion": c["notificaciones"],
+            "archivo": c["archivos"],
+            "archivo_asociacion": c["archivos"],
+            "auditoria": c["auditoria"],
+        }
+
+    # IDs: índice 0..n-1 dentro de la carga -> id real reservado
+    def id(self, table, index):
+        return self.bases[table] + 1 + index
+
+    # Los usuarios van en orden: administradores, médicos, pacientes
+    def medico_usuario(self, m):
+        return self.id("usuario", self.counts["admins"] + m)
+
+    def paciente_usuario(self, p):
+        return self.id("usuario", self.counts["admins"] + self.counts["medicos"] + p)
+
+    def cita(self, c):
+        """(índice de paciente, índice de médico, fecha_inicio) de la cita c."""
+        p = mix(self.seed, S_CITA_PACIENTE, c) % self.counts["pacientes"]
+        m = mix(self.seed, S_CITA_MEDICO, c) % self.counts["medicos"]
+        slot = mix(self.seed, S_CITA_FECHA, c) % self.slots
+        return p, m, self.start + timedelta(minutes=slot * SLOT_MINUTES)
+
+    def consulta_cita(self, k):
+        """Cada consulta pertenece a una cita distinta, repartidas en todo el rango."""
+        return k * self.counts["citas"] // self.counts["consultas"]
+
+    def rng(self, table, start):
+        """Generador para los atributos (no llaves) de un bloque."""
+        return random.Random(mix(self.seed, S_ROWS, hash_name(table) + start))
+
+
+def hash_name(name):
+    return sum((i + 1) * ord(ch) for i, ch in enumerate(name)) << 32
+
+
+def ts(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def person_name(rng):
+    return f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+
+
+def phone(rng):
+    return f"+52 {rng.randint(10, 99)} {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}"
+
+
+# ============================================================
+# 2. Filas por tabla (índices [start, stop) de la carga)
+# ============================================================
+
+def account(plan, u):
+    """(id, username, correo, rol) del usuario u; también lo usa users.csv."""
+    c = plan.counts
+    if u < c["admins"]:
+        prefix, rol = "admin", "admin"
+    elif u < c["admins"] + c["medicos"]:
+        prefix, rol = "dr", "medico"
+    else:
+        prefix, rol = "pac", "paciente"
+    user_id = plan.id("usuario", u)
+    username = f"bench_{prefix}_{user_id}"
+    return user_id, username, f"{username}@{DOMINIOS[user_id % len(DOMINIOS)]}", rol
+
+
+def rows_usuario(plan, start, stop):
+    rng = plan.rng("usuario", start)
+    for u in range(start, stop):
+        user_id, username, email, rol = account(plan, u)
+        yield user_id, username, email, phone(rng), plan.password_hash, ROLES[rol]
+
+
+def rows_medico(plan, start, stop):
+    rng = plan.rng("medico", start)
+    for m in range(start, stop):
+        medico_id = plan.id("medico", m)
+        yield (
+            medico_id, plan.medico_usuario(m), f"Dr. {person_name(rng)}",
+            f"MX{medico_id:08d}", rng.randint(1, ESPECIALIDADES),
+            phone(rng), rng.choice(CIUDADES),
+        )
+
+
+def rows_paciente(plan, start, stop):
+    rng = plan.rng("paciente", start)
+    for p in range(start, stop):
+        birth = plan.start - timedelta(days=rng.randint(365, 90 * 365))
+        medico = mix(plan.seed, S_PACIENTE_MEDICO, p) % plan.counts["medicos"]
+        yield (
+            plan.id("paciente", p), plan.paciente_usuario(p), person_name(rng),
+            birth.strftime("%Y-%m-%d"), rng.choice(["Femenino", "Masculino"]),
+            round(rng.uniform(150, 195), 1), round(rng.uniform(45, 120), 1),
+            rng.randint(1, TIPOS_SANGRE), rng.randint(1, OCUPACIONES),
+            rng.randint(1, ESTADOS_CIVILES), plan.id("medico", medico), phone(rng),
+        )
+
+
+def rows_cita(plan, start, stop):
+    rng = plan.rng("cita", start)
+    for c in range(start, stop):
+        p, m, fecha = plan.cita(c)
+        yield (
+            plan.id("cita", c), plan.id("paciente", p), plan.id("medico", m),
+            ts(fecha), ts(fecha + timedelta(minutes=SLOT_MINUTES)),
+            rng.randint(1, ESTADOS_CITA), rng.randint(1, TIPOS_CITA),
+        )
+
+
+def rows_consulta(plan, start, stop):
+    rng = plan.rng("consulta", start)
+    for k in range(start, stop):
+        c = plan.consulta_cita(k)
+        p, m, fecha = plan.cita(c)
+        diagnostico = rng.choice(DIAGNOSTICOS)
+        yield (
+            plan.id("consulta", k), plan.id("cita", c), rng.randint(1, ESTADOS_CONSULTA),
+            plan.id("paciente", p), plan.id("medico", m), ts(fecha),
+            f"Paciente acude por {diagnostico.lower()}.", diagnostico,
+        )
+
+
+def rows_notificacion(plan, start, stop):
+    rng = plan.rng("notificacion", start)
+    for n in range(start, stop):
+        c = mix(plan.seed, S_NOTIF_CITA, n) % plan.counts["citas"]
+        p, _, fecha = plan.cita(c)
+        yield (
+            plan.id("notificacion", n), plan.paciente_usuario(p), plan.id("cita", c),
+            f"Recordatorio de cita {ts(fecha)}", rng.choice(CANALES),
+            ts(fecha - timedelta(days=1)), rng.choice(ESTADOS_NOTIFICACION),
+        )
+
+
+def rows_archivo(plan, start, stop):
+    rng = plan.rng("archivo", start)
+    for f in range(start, stop):
+        archivo_id = plan.id("archivo", f)
+        tipo = rng.choice(TIPOS_ARCHIVO)
+        creado = plan.start + timedelta(minutes=rng.randint(0, plan.slots * SLOT_MINUTES))
+        yield (
+            archivo_id, tipo, f"https://storage.example.com/{tipo}/{archivo_id}.{tipo}",
+            f"{rng.getrandbits(128):032x}", ts(creado),
+        )
+
+
+def rows_archivo_asociacion(plan, start, stop):
+    rng = plan.rng("archivo_asociacion", start)
+    c = plan.counts
+    for f in range(start, stop):
+        target = mix(plan.seed, S_ARCHIVO_ENTIDAD, f)
+        if target % 10 < 7:
+            entidad, entidad_id = "PACIENTE", plan.id("paciente", target % c["pacientes"])
+        else:
+            entidad, entidad_id = "CONSULTA", plan.id("consulta", target % c["consultas"])
+        autor = plan.medico_usuario(rng.randrange(c["medicos"]))
+        yield (
+            plan.id("archivo_asociacion", f), plan.id("archivo", f), entidad, entidad_id,
+            "Documento clínico", autor,
+        )
+
+
+def rows_auditoria(plan, start, stop):
+    rng = plan.rng("auditoria", start)
+    c = plan.counts
+    entities = [("CITA", "cita", c["citas"]), ("CONSULTA", "consulta", c["consultas"]),
+                ("PACIENTE", "paciente", c["pacientes"])]
+    staff = c["admins"] + c["medicos"]
+    for a in range(start, stop):
+        entidad, table, count = entities[mix(plan.seed, S_AUDIT_ENTIDAD, a) % len(entities)]
+        usuario = plan.id("usuario", mix(plan.seed, S_AUDIT_USUARIO, a) % staff)
+        fecha = plan.start + timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+        yield (
+            plan.id("auditoria", a), usuario, rng.choice(ACCIONES), entidad,
+            plan.id(table, rng.randrange(count)),
+            f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}", "generate_data",
+            ts(fecha), json.dumps({"bulk": True}),
+        )
+
+
+TABLES = {
+    "usuario": (["id", "username", "correo", "telefono", "password_hash", "rol_id"], rows_usuario),
+    "medico": (["id", "usuario_id", "nombre", "cedula", "id_especialidad", "telefono",
+                "ubicacion"], rows_medico),
+    "paciente": (["id", "usuario_id", "nombre", "fecha_nacimiento", "sexo", "altura", "peso",
+                  "id_tipo_sangre", "id_ocupacion", "id_estado_civil", "id_medico_gen",
+                  "telefono"], rows_paciente),
+    "cita": (["id", "paciente_id", "medico_id", "fecha_inicio", "fecha_fin", "id_estado_cita",
+              "id_tipo_cita"], rows_cita),
+    "consulta": (["id", "cita_id", "id_estado_consulta", "id_paciente", "id_medico",
+                  "fecha_hora", "narrativa", "diagnostico_final"], rows_consulta),
+    "notificacion": (["id", "id_usuario", "id_cita", "mensaje", "canal", "fecha_envio",
+                      "estado"], rows_notificacion),
+    "archivo": (["id", "tipo", "url", "hash_integridad", "creado_en"], rows_archivo),
+    "archivo_asociacion": (["id", "archivo_id", "entidad", "entidad_id", "descripcion",
+                            "creado_por_usuario_id"], rows_archivo_asociacion),
+    "auditoria": (["id", "usuario_id", "accion", "entidad", "entidad_id", "ip", "origen",
+                   "fecha_hora", "detalle"], rows_auditoria),
+}
+
+# Orden de carga por llaves foráneas; las tablas de una fase van en paralelo
+PHASES = [
+    ["usuario"],
+    ["medico"],
+    ["paciente"],
+    ["cita", "archivo"],
+    ["consulta", "notificacion"],
+    ["archivo_asociacion", "auditoria"],
+]
+
+# Triggers de dashboard_aggregates.sql: guardarían cada bloque del COPY como
+# tabla de transición solo para contarlo, así que se apagan durante la carga
+# y los contadores se recalculan al final
+DASHBOARD_TRIGGERS = [
+    (table, f"trg_dashboard_{table}_{event}")
+    for table in ("medico", "paciente", "consulta")
+    for event in ("ins", "del", "trunc")
+]
+
+
+# ============================================================
+# 3. COPY en paralelo
+# ============================================================
+
+_worker = {}
+
+
+def init_worker(dsn, plan):
+    _worker["conn"] = psycopg2.connect(dsn)
+    _worker["plan"] = plan
+
+
+def copy_chunk(task):
+    """Genera el bloque [start, stop) de una tabla y lo carga con COPY."""
+    table, start, stop = task
+    columns, rows = TABLES[table]
+    buffer = io.StringIO()
+    # Campos vacíos sin comillas = NULL en COPY ... CSV
+    csv.writer(buffer).writerows(rows(_worker["plan"], start, stop))
+    buffer.seek(0)
+
+    conn = _worker["conn"]
+    with conn.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    conn.commit()
+    return table, stop - start
+
+
+def chunks(table, count, chunk_size):
+    return [(table, start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+
+def reserve_ids(conn, counts):
+    """Avanza cada secuencia ``count`` posiciones y devuelve el ID base.
+
+    Los IDs del rango (base, base + count] quedan para esta carga aunque el
+    backend siga insertando filas mientras tanto (el LOCK solo dura lo que
+    tarda la reserva).
+    """
+    bases = {}
+    with conn.cursor() as cur:
+        for table, count in counts.items():
+            cur.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+            cur.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+            sequence = cur.fetchone()[0]
+            cur.execute(
+                f"""
+                SELECT setval(%s, GREATEST(
+                    (SELECT COALESCE(MAX(id), 0) FROM {table}),
+                    (SELECT last_value FROM {sequence})
+                ) + %s) - %s
+                """,
+                (sequence, count, count),
+            )
+            bases[table] = cur.fetchone()[0]
+    conn.commit()
+    return bases
+
+
+def existing_triggers(conn):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT tgname FROM pg_trigger WHERE tgname = ANY(%s)",
+            ([trigger for _table, trigger in DASHBOARD_TRIGGERS],),
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
+def set_dashboard_triggers(conn, triggers, enabled):
+    action = "ENABLE" if enabled else "DISABLE"
+    with conn.cursor() as cur:
+        for table, trigger in DASHBOARD_TRIGGERS:
+            if trigger in triggers:
+                cur.execute(f"ALTER TABLE {table} {action} TRIGGER {trigger}")
+    conn.commit()
+
+
+def sync_dashboard(conn):
+    """Recalcula los contadores y refresca las vistas del dashboard."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT sync_dashboard_counters()")
+        cur.execute("SELECT refresh_dashboard_aggregates()")
+    conn.commit()
+
+
+def load(dsn, plan, workers, chunk_size):
+    counts = plan.table_counts()
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(dsn, plan)) as pool:
+        for phase in PHASES:
+            tasks = [task for table in phase for task in chunks(table, counts[table], chunk_size)]
+            started = time.time()
+            loaded = 0
+            for table, rows in pool.imap_unordered(copy_chunk, tasks):
+                loaded += rows
+            elapsed = time.time() - started
+            print(
+                f"   ✔ {', '.join(phase)}: {loaded:,} filas en {elapsed:.1f}s "
+                f"({loaded / max(elapsed, 1e-6):,.0f} filas/s)"
+            )
+
+
+# ============================================================
+# 4. users.csv e id_catalog.json
+# ============================================================
+
+def spread(values, limit):
+    """Hasta ``limit`` elementos repartidos en todo el rango."""
+    if limit <= 0 or len(values) <= limit:
+        return list(values)
+    step = len(values) / limit
+    return [values[int(i * step)] for i in range(limit)]
+
+
+def export_users(plan, path, password, accounts):
+    """Cuentas para el harness: 10% administradores, 30% médicos, 60% pacientes."""
+    c = plan.counts
+    groups = [
+        (range(0, c["admins"]), 0.1),
+        (range(c["admins"], c["admins"] + c["medicos"]), 0.3),
+        (range(c["admins"] + c["medicos"], plan.users), 0.6),
+    ]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "email", "password", "rol"])
+        rows = 0
+        for indexes, share in groups:
+            for u in spread(indexes, max(1, math.ceil(accounts * share))):
+                _, username, email, rol = account(plan, u)
+                writer.writerow([username, email, password, rol])
+                rows += 1
+    print(f"👥 {rows} cuentas escritas en {path}")
+
+
+def export_catalog(plan, path, database, limit):
+    c = plan.counts
+    kinds = {
+        "usuarios": ("usuario", plan.users),
+        "medicos": ("medico", c["medicos"]),
+        "pacientes": ("paciente", c["pacientes"]),
+        "citas": ("cita", c["citas"]),
+        "consultas": ("consulta", c["consultas"]),
+    }
+    ids = {
+        kind: spread([plan.id(table, i) for i in range(count)], limit)
+        for kind, (table, count) in kinds.items()
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "exported_at": datetime.now().isoformat(),
+                "database": database,
+                "generated_by": "generate_data.py",
+                "ids": ids,
+            },
+            f,
+            indent=2,
+        )
+    print(f"📌 Catálogo de IDs escrito en {path}")
+
+
+# ============================================================
+# 5. CLI
+# ============================================================
+
+def default_dsn():
+    return (
+        f"host={os.environ.get('DB_HOST', 'localhost')} "
+        f"port={os.environ.get('DB_PORT', '5432')} "
+        f"dbname={os.environ.get('DB_NAME', 'cms_medico')} "
+        f"user={os.environ.get('DB_USER', 'postgres')} "
+        f"password={os.environ.get('DB_PASSWORD', '')}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Siembra datos sintéticos a escala para benchmarks")
+    parser.add_argument("--scale", type=parse_scale, default=1.0,
+                        help="Factor de escala: 1x, 10x, 100x o un número")
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 2),
+                        help="Procesos que cargan bloques en paralelo")
+    parser.add_argument("--chunk-size", type=int, default=50_000,
+                        help="Filas por bloque COPY")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dsn", default=None, help="DSN de libpq (por defecto DB_* del entorno)")
+    parser.add_argument("--password", default="123456",
+                        help="Contraseña de todas las cuentas generadas")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--accounts", type=int, default=300,
+                        help="Cuentas a exportar en users.csv")
+    parser.add_argument("--users-csv", default=os.path.join(HERE, "users.csv"))
+    parser.add_argument("--id-catalog-file", default=os.path.join(HERE, "id_catalog.json"))
+    parser.add_argument("--catalog-limit", type=int, default=100_000,
+                        help="Máximo de IDs por tipo en id_catalog.json (0 = todos)")
+    args = parser.parse_args(argv)
+
+    dsn = args.dsn or default_dsn()
+    started = time.time()
+
+    # Un solo hash para todas las cuentas (prefijo 2a, el que genera bcryptjs)
+    password_hash = bcrypt.hashpw(
+        args.password.encode(), bcrypt.gensalt(rounds=args.bcrypt_rounds, prefix=b"2a")
+    ).decode()
+
+    conn = psycopg2.connect(dsn)
+    plan = Plan(args.scale, args.seed, password_hash, bases={}, now=datetime.now())
+    plan.bases = reserve_ids(conn, plan.table_counts())
+    totals = ", ".join(f"{table}={count:,}" for table, count in plan.table_counts().items())
+    print(f"🚀 Escala {args.scale:g}x con {args.workers} procesos: {totals}")
+
+    triggers = existing_triggers(conn)
+    set_dashboard_triggers(conn, triggers, enabled=False)
+    try:
+        load(dsn, plan, args.workers, args.chunk_size)
+    finally:
+        set_dashboard_triggers(conn, triggers, enabled=True)
+
+    if triggers:
+        print("📊 Recalculando agregados del dashboard...")
+        sync_dashboard(conn)
+
+    print("🔎 ANALYZE de las tablas cargadas...")
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        for table in TABLES:
+            cur.execute(f"ANALYZE {table}")
+        cur.execute("SELECT current_database()")
+        database = cur.fetchone()[0]
+    conn.close()
+
+    export_users(plan, args.users_csv, args.password, args.accounts)
+    export_catalog(plan, args.id_catalog_file, database, args.catalog_limit)
+    print(f"✅ Carga completa en {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
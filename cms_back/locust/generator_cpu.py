@@ -0,0 +1,96 @@
+"""
+CPU del generador de carga por request
+--------------------------------------
+
+Cada proceso que genera carga (modo local o worker) mide su tiempo de CPU
+(time.process_time) desde el primer request hasta el fin de la prueba y
+cuenta cuántos requests hizo. Los workers envían sus totales al master,
+que los suma. Con los ms de CPU por request se estima cuántos requests
+por segundo aguanta un núcleo y cuántos workers hacen falta para una tasa
+objetivo (--target-rps).
+
+Un worker de Locust corre en un solo núcleo (gevent), así que se planea
+para que cada uno no pase de WORKER_CPU_BUDGET; por encima de ~90% Locust
+avisa y la latencia medida deja de ser confiable.
+"""
+
+import math
+import time
+
+WORKER_CPU_BUDGET = 0.75
+
+
+class GeneratorCpu:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started_cpu = None
+        self.started_wall = None
+        self.requests = 0
+        self.processes = {}  # nodo -> totales de sample()
+
+    def on_request(self):
+        # Se empieza a medir con el primer request: el pre-calentamiento de
+        # tokens y el arranque de Locust no cuentan como costo por request
+        if self.started_cpu is None:
+            self.started_cpu = time.process_time()
+            self.started_wall = time.monotonic()
+        self.requests += 1
+
+    def sample(self):
+        """Totales de este proceso: segundos de CPU, segundos de reloj y requests."""
+        if self.started_cpu is None:
+            return {"cpu_s": 0.0, "wall_s": 0.0, "requests": 0}
+        return {
+            "cpu_s": time.process_time() - self.started_cpu,
+            "wall_s": time.monotonic() - self.started_wall,
+            "requests": self.requests,
+        }
+
+    def add(self, node, totals):
+        self.processes[node] = totals
+
+    def summary(self, engine, target_rps=0):
+        processes = [p for p in self.processes.values() if p["requests"]]
+        if not processes:
+            return None
+        requests = sum(p["requests"] for p in processes)
+        cpu_s = sum(p["cpu_s"] for p in processes)
+        wall_s = max(p["wall_s"] for p in processes)
+        cpu_ms = cpu_s * 1000 / requests
+        summary = {
+            "engine": engine,
+            "processes": len(processes),
+            "requests": requests,
+            "cpu_s": round(cpu_s, 2),
+            "cpu_ms_per_request": round(cpu_ms, 3),
+            "rps": round(requests / wall_s, 1) if wall_s else 0,
+            "avg_cpu_utilization": round(
+                sum(p["cpu_s"] / p["wall_s"] for p in processes if p["wall_s"]) / len(processes), 3
+            ),
+            "rps_per_worker": round(WORKER_CPU_BUDGET * 1000 / cpu_ms, 1) if cpu_ms else None,
+        }
+        if target_rps and cpu_ms:
+            summary["target_rps"] = target_rps
+            summary["workers_needed"] = math.ceil(target_rps * cpu_ms / 1000 / WORKER_CPU_BUDGET)
+        return summary
+
+
+def print_summary(summary):
+    if not summary:
+        return
+    print(
+        f"🖥️ Generador ({summary['engine']}): {summary['cpu_ms_per_request']}ms CPU por request, "
+        f"{summary['requests']} requests en {summary['processes']} procesos "
+        f"({summary['rps']} req/s, CPU promedio {summary['avg_cpu_utilization']:.0%})"
+    )
+    print(
+        f"🖥️ Capacidad estimada: {summary['rps_per_worker']} req/s por worker "
+        f"al {WORKER_CPU_BUDGET:.0%} de un núcleo"
+    )
+    if "workers_needed" in summary:
+        print(f"🖥️ Para {summary['target_rps']} req/s se necesitan {summary['workers_needed']} workers")
+
+
+GENERATOR_CPU = GeneratorCpu()
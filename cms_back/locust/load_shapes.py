@@ -0,0 +1,352 @@
+"""
+Perfiles de carga de modelo abierto (tasa de llegada) para el harness
+--------------------------------------------------------------------
+
+Con ``wait_time = between(1, 3)`` cada usuario espera su respuesta antes de
+pedir la siguiente: si la API se vuelve lenta, los usuarios piden menos y
+el throughput medido baja, escondiendo la saturación. Con LOCUST_SHAPE
+activo cada usuario va a ritmo fijo (constant_throughput de LOCUST_USER_RPS
+tareas por segundo) y el perfil calcula cuántos usuarios hacen falta para
+la tasa objetivo con la ley de Little:
+
+    usuarios = rps × max(1 / LOCUST_USER_RPS, latencia actual)
+
+así la tasa de llegada se mantiene aunque la latencia crezca.
+
+Perfiles (LOCUST_SHAPE):
+
+    constant  tasa fija de --shape-rps
+    step      escalones de --shape-step-rps cada --shape-step-time segundos
+    spike     tasa base de --shape-rps con un pico de 5× durante un minuto
+    soak      rampa corta y --shape-rps sostenido por horas
+    diurnal   día de consulta comprimido en --shape-duration, con el pico de
+              citas en la mañana y uno menor en la tarde (--shape-rps = pico)
+    capacity  sube escalones hasta romper el SLO (--slo-p95-ms,
+              --slo-error-rate) en --slo-endpoints y reporta el máximo RPS
+              sostenible
+
+Casi todas las tareas hacen un solo request; las de DeepPagingUser recorren
+varias páginas, así que con ese escenario activo los req/s reales son más.
+"""
+
+import math
+import os
+from collections import Counter
+
+from locust import LoadTestShape, between, constant_throughput
+from locust.stats import calculate_response_time_percentile
+
+LOCUST_SHAPE = os.environ.get("LOCUST_SHAPE", "").strip().lower()
+USER_RPS = float(os.environ.get("LOCUST_USER_RPS", "0.5"))
+
+DEFAULT_SLO_ENDPOINTS = "List My Appointments,Get Patient Info"
+
+
+def think_time(low, high):
+    """between(low, high) en modo cerrado; ritmo fijo por usuario si hay perfil."""
+    if LOCUST_SHAPE:
+        return constant_throughput(USER_RPS)
+    return between(low, high)
+
+
+# ============================================================
+# 1. Base: tasa de llegada -> usuarios
+# ============================================================
+
+class ArrivalRateShape(LoadTestShape):
+    abstract = True
+    duration = 600  # segundos, si no se pasa --shape-duration
+    max_users = 5000  # tope para no tumbar al generador si la API se cuelga
+    # Cambios menores a esta fracción no re-balancean usuarios
+    hysteresis = 0.05
+
+    def __init__(self):
+        super().__init__()
+        self.users = 0
+
+    def option(self, name, default=None):
+        options = self.runner.environment.parsed_options if self.runner else None
+        value = getattr(options, name, None) if options else None
+        # Un 0 explícito (p. ej. --slo-error-rate 0) es un valor, no "sin definir"
+        return default if value is None else value
+
+    def get_duration(self):
+        return self.option("shape_duration", self.duration)
+
+    def target_rps(self, run_time):
+        """Tasa objetivo en el segundo ``run_time``; None termina la prueba."""
+        raise NotImplementedError
+
+    def users_for(self, rps):
+        latency_s = (self.runner.stats.total.get_current_response_time_percentile(0.5) or 0) / 1000
+        users = math.ceil(rps * max(1 / USER_RPS, latency_s))
+        users = min(max(users, 1), self.max_users)
+        if self.users and abs(users - self.users) <= self.users * self.hysteresis:
+            return self.users
+        self.users = users
+        return users
+
+    def tick(self):
+        rps = self.target_rps(self.get_run_time())
+        if rps is None:
+            return None
+        users = self.users_for(rps)
+        # Llegar a la tasa en ~1 segundo: el pico de un spike no espera rampa
+        return users, max(users, 1)
+
+    def report(self):
+        """Resumen para el reporte de benchmark (None si el perfil no mide nada)."""
+        return None
+
+
+# ============================================================
+# 2. Perfiles
+# ============================================================
+
+class ConstantArrivalShape(ArrivalRateShape):
+    abstract = True
+
+    def target_rps(self, run_time):
+        if run_time >= self.get_duration():
+            return None
+        return self.option("shape_rps", 20)
+
+
+class StepShape(ArrivalRateShape):
+    abstract = True
+
+    def target_rps(self, run_time):
+        if run_time >= self.get_duration():
+            return None
+        step_rps = self.option("shape_step_rps", 10)
+        step_time = self.option("shape_step_time", 60)
+        return step_rps * (int(run_time // step_time) + 1)
+
+
+class SpikeShape(ArrivalRateShape):
+    abstract = True
+    spike_factor = 5
+    spike_start = 0.4  # fracción de la duración
+    spike_time = 60
+
+    def target_rps(self, run_time):
+        duration = self.get_duration()
+        if run_time >= duration:
+            return None
+        rps = self.option("shape_rps", 20)
+        start = duration * self.spike_start
+        if start <= run_time < start + self.spike_time:
+            return rps * self.spike_factor
+        return rps
+
+
+class SoakShape(ArrivalRateShape):
+    abstract = True
+    duration = 4 * 3600
+    ramp_time = 300
+
+    def target_rps(self, run_time):
+        if run_time >= self.get_duration():
+            return None
+        rps = self.option("shape_rps", 20)
+        return max(rps * min(run_time / self.ramp_time, 1), 1)
+
+
+# Fracción del pico por hora del día (7:00 a 20:00): entrada fuerte de citas
+# de 8 a 11, baja al mediodía y un segundo pico menor por la tarde
+CLINIC_DAY = [
+    (7, 0.15), (8, 0.7), (9, 1.0), (10, 0.95), (11, 0.75), (12, 0.45),
+    (13, 0.35), (14, 0.5), (15, 0.6), (16, 0.65), (17, 0.5), (18, 0.3),
+    (19, 0.15), (20, 0.05),
+]
+
+
+class DiurnalShape(ArrivalRateShape):
+    abstract = True
+    duration = 3600  # el día completo de 7:00 a 20:00 comprimido en una hora
+
+    def target_rps(self, run_time):
+        duration = self.get_duration()
+        if run_time >= duration:
+            return None
+        first, last = CLINIC_DAY[0][0], CLINIC_DAY[-1][0]
+        hour = first + (last - first) * run_time / duration
+        for (h0, f0), (h1, f1) in zip(CLINIC_DAY, CLINIC_DAY[1:]):
+            if h0 <= hour <= h1:
+                fraction = f0 + (f1 - f0) * (hour - h0) / (h1 - h0)
+                break
+        return max(self.option("shape_rps", 20) * fraction, 1)
+
+
+# ============================================================
+# 3. Búsqueda de capacidad guiada por SLO
+# ============================================================
+
+class EndpointWindow:
+    """Requests, fallas e histograma de un endpoint desde el inicio de una ventana."""
+
+    def __init__(self, entries):
+        self.requests = sum(e.num_requests for e in entries)
+        self.failures = sum(e.num_failures for e in entries)
+        self.response_times = Counter()
+        for entry in entries:
+            self.response_times.update(entry.response_times)
+
+    def since(self, start):
+        requests = self.requests - start.requests
+        failures = self.failures - start.failures
+        histogram = self.response_times - start.response_times
+        return {
+            "requests": requests,
+            "error_rate": round(failures / requests, 4) if requests else None,
+            "p95_ms": calculate_response_time_percentile(histogram, requests, 0.95) if requests else None,
+        }
+
+
+class CapacitySearchShape(ArrivalRateShape):
+    """
+    Sube la tasa un escalón de --shape-step-rps cada --shape-step-time
+    segundos. El primer tercio de cada escalón es calentamiento; con el
+    resto se calcula p95 y tasa de error de cada endpoint del SLO. El
+    primer escalón que rompe el SLO (o que no alcanza el 90% de la tasa
+    pedida) termina la prueba; la tasa objetivo del escalón más alto que
+    pasó es el máximo sostenible. Si la prueba termina a mitad de un
+    escalón (--shape-duration o un stop manual) se evalúa lo medido de ese
+    escalón y se marca como parcial; si aún estaba calentando, se descarta.
+    """
+    abstract = True
+    duration = 3600
+    warmup_fraction = 1 / 3
+    min_rps_ratio = 0.9
+
+    def __init__(self):
+        super().__init__()
+        self.clear()
+
+    def clear(self):
+        self.steps = []
+        self.breach = None
+        self.window = None  # (índice del escalón, inicio, snapshot)
+        self.summary_printed = False
+
+    def reset_time(self):
+        # Una prueba nueva (p. ej. desde la UI web) empieza la búsqueda de cero
+        super().reset_time()
+        self.clear()
+
+    def slo(self):
+        endpoints = self.option("slo_endpoints", DEFAULT_SLO_ENDPOINTS)
+        return {
+            "endpoints": [e.strip() for e in endpoints.split(",") if e.strip()],
+            "p95_ms": self.option("slo_p95_ms", 500),
+            "error_rate": self.option("slo_error_rate", 0.01),
+        }
+
+    def snapshot(self, endpoints):
+        stats = self.runner.stats
+        by_name = {name: [] for name in endpoints}
+        for (name, _method), entry in stats.entries.items():
+            if name in by_name:
+                by_name[name].append(entry)
+        windows = {name: EndpointWindow(entries) for name, entries in by_name.items()}
+        return stats.total.num_requests, windows
+
+    def evaluate(self, run_time, partial=False):
+        """Cierra la ventana medida del escalón en curso y la compara con el SLO."""
+        index, started, start = self.window
+        self.window = None
+        if run_time <= started:
+            return
+        target = self.option("shape_step_rps", 10) * (index + 1)
+        slo = self.slo()
+        total, windows = self.snapshot(slo["endpoints"])
+        step = {
+            "target_rps": target,
+            "rps": round((total - start[0]) / (run_time - started), 1),
+            "endpoints": {name: window.since(start[1][name]) for name, window in windows.items()},
+            "partial": partial,
+        }
+        reasons = []
+        if step["rps"] < target * self.min_rps_ratio:
+            reasons.append(f"solo {step['rps']} de {target} req/s")
+        for name, result in step["endpoints"].items():
+            if not result["requests"]:
+                continue
+            if result["p95_ms"] > slo["p95_ms"]:
+                reasons.append(f"{name} p95={result['p95_ms']}ms > {slo['p95_ms']}ms")
+            if result["error_rate"] > slo["error_rate"]:
+                reasons.append(f"{name} errores={result['error_rate']:.2%} > {slo['error_rate']:.2%}")
+        step["ok"] = not reasons
+        self.steps.append(step)
+
+        status = "✅" if step["ok"] else "❌"
+        detail = ", ".join(
+            f"{name} p95={r['p95_ms']}ms err={r['error_rate']}" for name, r in step["endpoints"].items()
+        )
+        label = " (parcial)" if partial else ""
+        print(f"{status} Escalón {index + 1}{label}: {step['rps']}/{target} req/s  {detail}")
+        if reasons:
+            self.breach = "; ".join(reasons)
+            print(f"🛑 SLO roto: {self.breach}")
+
+    def target_rps(self, run_time):
+        step_rps = self.option("shape_step_rps", 10)
+        step_time = self.option("shape_step_time", 60)
+        index = int(run_time // step_time)
+        warmup_end = index * step_time + step_time * self.warmup_fraction
+
+        # Al cambiar de escalón se evalúa la ventana medida del anterior
+        if self.window and self.window[0] != index:
+            self.evaluate(run_time)
+        if not self.breach and run_time >= self.get_duration():
+            if self.window:
+                self.evaluate(run_time, partial=True)
+        if self.breach or run_time >= self.get_duration():
+            self.print_summary()
+            return None
+
+        if not self.window and run_time >= warmup_end:
+            self.window = (index, run_time, self.snapshot(self.slo()["endpoints"]))
+        return step_rps * (index + 1)
+
+    def max_sustainable_rps(self):
+        # La tasa pedida, no la medida: la medida oscila alrededor del objetivo
+        passed = [step["target_rps"] for step in self.steps if step["ok"]]
+        return max(passed) if passed else 0
+
+    def report(self):
+        # Prueba detenida a mitad de un escalón sin pasar por target_rps()
+        if self.window and not self.breach:
+            self.evaluate(self.get_run_time(), partial=True)
+        return {
+            "shape": "capacity",
+            "slo": self.slo(),
+            "max_sustainable_rps": self.max_sustainable_rps(),
+            "breach": self.breach,
+            "steps": self.steps,
+        }
+
+    def print_summary(self):
+        if self.summary_printed:
+            return
+        self.summary_printed = True
+        if self.breach:
+            print(f"📈 Máximo RPS sostenible: {self.max_sustainable_rps()} req/s")
+        else:
+            print(
+                f"📈 Sin romper el SLO hasta {self.max_sustainable_rps()} req/s "
+                f"(se acabó --shape-duration; subir la duración para seguir buscando)"
+            )
+
+
+SHAPES = {
+    "constant": ConstantArrivalShape,
+    "step": StepShape,
+    "spike": SpikeShape,
+    "soak": SoakShape,
+    "diurnal": DiurnalShape,
+    "capacity": CapacitySearchShape,
+}
+
+if LOCUST_SHAPE and LOCUST_SHAPE not in SHAPES:
+    raise SystemExit(f"❌ LOCUST_SHAPE desconocido: {LOCUST_SHAPE} (usar {', '.join(SHAPES)})")
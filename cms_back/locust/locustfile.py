@@ -5,11 +5,23 @@ Locust Load Testing File for CMS Medical API with CSV Login Support
 Este archivo ya está completamente modificado para:
 
 ✔ Leer usuarios de users.csv (username/email + password)
-✔ Elegir un usuario aleatorio para cada usuario virtual
-✔ Generar token dinámicamente
+✔ Repartir cuentas e IDs reales entre workers sin traslape (ver workload.py)
+✔ Generar parámetros con semilla fija y distribución Zipf (corridas comparables)
+✔ Generar token dinámicamente (pool pre-calentado, ver token_pool.py)
+✔ Re-logear solo cuando el token expira
+✔ Escenario "login storm" opcional para medir autenticación a propósito
+✔ Escenario opcional de dashboard: cache caliente vs lectura en frío
+✔ Escenario opcional de paginación profunda: offset vs cursor
+✔ Escenario opcional de escritura intensiva (citas y consultas)
+✔ Escenario opcional de búsquedas (?search) para medir los índices
+✔ Escenario opcional de catálogos con ETag / If-None-Match
 ✔ Continuar con todos tus escenarios (Admin, Doctor, Paciente)
 ✔ Mantener TODAS tus tareas tal cual estaban
 ✔ Mantener eventos y logs
+✔ Reporte por endpoint para la suite de regresión (ver benchmark.py)
+✔ Motor HTTP intercambiable: requests o FastHttpUser con keep-alive
+✔ CPU del generador por request y workers necesarios (ver generator_cpu.py)
+✔ Perfiles de tasa de llegada y búsqueda de capacidad por SLO (ver load_shapes.py)
 
 IMPORTANTE:
 ----------
@@ -20,13 +32,28 @@ username,password
 carlos_ramirez,123456
 laura_sanchez,123456
 dr_roberto,123456
+
+Para usar IDs que existen en la base de datos, exporta el catálogo después
+de sembrar los datos:
+
+node locust/export-id-catalog.js
 """
 
-from locust import HttpUser, task, between, events
+from locust import FastHttpUser, HttpUser, task, events
+from locust.runners import MasterRunner, WorkerRunner
 import random
 import csv
 import os
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from token_pool import LOGIN_PATH, TOKEN_POOL, account_credentials
+from workload import DEFAULT_CATALOG_FILE, WORKLOAD, load_id_catalog
+from benchmark import write_report
+from generator_cpu import GENERATOR_CPU
+import generator_cpu
+from load_shapes import LOCUST_SHAPE, SHAPES, DEFAULT_SLO_ENDPOINTS, think_time
+import server_metrics
 
 # ============================================================
 # 1. Cargar usuarios desde CSV
@@ -53,60 +80,87 @@ def load_users_from_csv():
     return users
 
 
-USERS = load_users_from_csv()
+# Las cuentas y el catálogo de IDs solo se cargan en el master (o en modo
+# local); cada worker recibe su shard por mensaje en on_test_start.
+DEFAULT_LOGIN = {
+    "username": "carlos_ramirez",
+    "password": "password123"
+}
 
 
 # ============================================================
 # 2. Clase base CMSUser con login dinámico desde CSV
 # ============================================================
 
-class CMSUser(HttpUser):
-    wait_time = between(1, 3)
+# Motor HTTP de todos los usuarios: "http" (requests, por defecto) o "fast"
+# (FastHttpUser/geventhttpclient, reutiliza la conexión keep-alive y gasta
+# bastante menos CPU por request). Las tareas se escriben una sola vez y
+# corren igual sobre cualquiera de los dos:
+#
+#     LOCUST_ENGINE=fast locust -f locustfile.py
+ENGINES = {"http": HttpUser, "fast": FastHttpUser}
+LOCUST_ENGINE = os.environ.get("LOCUST_ENGINE", "http").strip().lower()
+if LOCUST_ENGINE not in ENGINES:
+    raise SystemExit(f"❌ LOCUST_ENGINE desconocido: {LOCUST_ENGINE} (usar {' o '.join(ENGINES)})")
+EngineUser = ENGINES[LOCUST_ENGINE]
+
+
+class CMSUser(EngineUser):
+    # Con LOCUST_SHAPE cada usuario va a ritmo fijo (modelo abierto)
+    wait_time = think_time(1, 3)
+    # Solo aplican al motor "fast"; cada usuario tiene un greenlet, así que
+    # una conexión persistente por usuario basta
+    concurrency = 1
+    connection_timeout = 30.0
+    network_timeout = 60.0
 
     def on_start(self):
         """
-        PRIMERO: Logeo diná mico usando un usuario del CSV.
+        PRIMERO: Tomar un token del pool pre-calentado para un usuario del CSV.
+        Solo si la cuenta no tiene token vigente se hace login dinámico.
         Si falla, este usuario virtual no continuará tareas.
         """
         self.token = None
         self.user_id = None
         self.username = None
+        self.token_entry = None
         self.login_successful = False
 
-        # Seleccionar usuario desde CSV
-        if USERS:
-            selected = random.choice(USERS)
-            # El CSV tiene email, pero el login usa username
-            # El username se genera como la parte antes del @ del email
-            email = selected.get("email") or selected.get("correo") or ""
-            username = selected.get("username") or email.split("@")[0] if email else ""
-            login_data = {
-                "username": username,
-                "password": selected.get("password")
-            }
+        # Cuenta del shard (round-robin) y generador sembrado de este usuario
+        account, self.ids = WORKLOAD.new_user()
+        self.rng = self.ids.rng
+        # Fallback si no existe CSV
+        self.login_data = account_credentials(account) if account else DEFAULT_LOGIN
+
+        entry = TOKEN_POOL.get(self.login_data["username"])
+        if entry:
+            self.use_token(entry)
         else:
-            # Fallback si no existe CSV
-            login_data = {
-                "username": "carlos_ramirez",
-                "password": "password123"
-            }
+            self.login(name="[1] PRIMERO - Login - Generar Token")
+
+    def use_token(self, entry):
+        self.token_entry = entry
+        self.token = entry.get("token")
+        self.user_id = entry.get("user_id")
+        self.username = entry.get("username")
+        self.login_successful = self.token is not None
+
+    def login(self, name):
+        """Login real contra /api/auth/login; el token resultante entra al pool."""
+        self.login_successful = False
 
         with self.client.post(
-            "/api/auth/login",
-            json=login_data,
+            LOGIN_PATH,
+            json=self.login_data,
             catch_response=True,
-            name="[1] PRIMERO - Login - Generar Token"
+            name=name
         ) as response:
 
             if response.status_code == 200:
                 try:
                     data = response.json()
-                    self.token = data.get("token")
-                    self.user_id = data.get("user", {}).get("id")
-                    self.username = data.get("user", {}).get("username")
-
-                    if self.token:
-                        self.login_successful = True
+                    if data.get("token"):
+                        self.use_token(TOKEN_POOL.put(self.login_data["username"], data))
                         response.success()
                     else:
                         response.failure("⚠️ Token no recibido en respuesta")
@@ -127,7 +181,14 @@ class CMSUser(HttpUser):
         return {"Content-Type": "application/json"}
 
     def is_authenticated(self):
-        """Verifica si el login fue exitoso."""
+        """Verifica si el login fue exitoso; re-logea solo si el token expiró."""
+        if self.login_successful and not TOKEN_POOL.is_valid(self.token_entry):
+            entry = TOKEN_POOL.get(self.login_data["username"])
+            if entry:
+                # Otro usuario del mismo proceso ya renovó esta cuenta
+                self.use_token(entry)
+            else:
+                self.login(name="[1] Login - Renovar Token Expirado")
         return self.login_successful and self.token is not None
 
     # --------------------------------------------------------
@@ -166,9 +227,9 @@ class AdminUser(CMSUser):
         if not self.is_authenticated():
             return
         params = {
-            "limit": random.randint(10, 50),
+            "limit": self.rng.randint(10, 50),
             "offset": 0,
-            "search": random.choice(["", "admin", "doctor", "patient"])
+            "search": self.rng.choice(["", "admin", "doctor", "patient"])
         }
         self.client.get("/api/users", headers=self.get_headers(), params=params, name="List Users")
 
@@ -176,21 +237,21 @@ class AdminUser(CMSUser):
     def get_user_by_id(self):
         if not self.is_authenticated():
             return
-        user_id = random.randint(1, 100)
+        user_id = self.ids.pick("usuarios")
         self.client.get(f"/api/users/{user_id}", headers=self.get_headers(), name="Get User by ID")
 
     @task(2)
     def list_patients(self):
         if not self.is_authenticated():
             return
-        params = {"limit": random.randint(10, 50), "offset": 0}
+        params = {"limit": self.rng.randint(10, 50), "offset": 0}
         self.client.get("/api/patients", headers=self.get_headers(), params=params, name="List Patients")
 
     @task(2)
     def list_doctors(self):
         if not self.is_authenticated():
             return
-        params = {"limit": random.randint(10, 50), "offset": 0}
+        params = {"limit": self.rng.randint(10, 50), "offset": 0}
         self.client.get("/api/doctors", headers=self.get_headers(), params=params, name="List Doctors")
 
     @task(4)
@@ -240,8 +301,7 @@ class DoctorUser(CMSUser):
 
     def on_start(self):
         super().on_start()
-        self.doctor_id = random.randint(1, 10)
-        self.patient_ids = list(range(1, 50))
+        self.doctor_id = self.ids.pick("medicos")
 
     @task(6)
     def list_my_appointments(self):
@@ -256,15 +316,15 @@ class DoctorUser(CMSUser):
     def list_consultations(self):
         if not self.is_authenticated():
             return
-        patient_id = random.choice(self.patient_ids)
-        params = {"paciente_id": patient_id, "limit": random.randint(10, 30)}
+        patient_id = self.ids.pick("pacientes")
+        params = {"paciente_id": patient_id, "limit": self.rng.randint(10, 30)}
         self.client.get("/api/appointments/consultas", headers=self.get_headers(), params=params, name="List Consultations")
 
     @task(4)
     def get_patient_info(self):
         if not self.is_authenticated():
             return
-        patient_id = random.choice(self.patient_ids)
+        patient_id = self.ids.pick("pacientes")
         self.client.get(f"/api/patients/{patient_id}", headers=self.get_headers(), name="Get Patient Info")
 
 
@@ -277,7 +337,7 @@ class PatientUser(CMSUser):
 
     def on_start(self):
         super().on_start()
-        self.patient_id = random.randint(1, 50)
+        self.patient_id = self.ids.pick("pacientes")
 
     @task(5)
     def get_my_appointments(self):
@@ -290,20 +350,653 @@ class PatientUser(CMSUser):
 
 
 # ============================================================
-# 6. EVENT LOGS
+# 6. LOGIN STORM (mide throughput de autenticación a propósito)
+# ============================================================
+
+class LoginStormUser(EngineUser):
+    """
+    Escenario separado que SIEMPRE hace login (bcrypt en el backend) y nunca
+    usa el pool de tokens. Está desactivado por defecto; se activa dándole
+    un peso explícito:
+
+        LOCUST_LOGIN_STORM_WEIGHT=2 locust -f locustfile.py
+    """
+    weight = int(os.environ.get("LOCUST_LOGIN_STORM_WEIGHT", "0"))
+    abstract = weight <= 0
+    wait_time = think_time(1, 3)
+
+    @task
+    def login_storm(self):
+        login_data = account_credentials(random.choice(WORKLOAD.users)) if WORKLOAD.users else DEFAULT_LOGIN
+        with self.client.post(
+            LOGIN_PATH,
+            json=login_data,
+            catch_response=True,
+            name="[Login Storm] Login"
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f"❌ Login falló: código {response.status_code}")
+
+
+# ============================================================
+# 7. DASHBOARD CACHE (cache caliente vs lectura en frío)
+# ============================================================
+
+class DashboardCacheUser(CMSUser):
+    """
+    Compara el dashboard servido desde el cache/agregados precalculados
+    contra la lectura en frío sobre las tablas base (?source=live).
+    Cada request se reporta como [cache hit], [cache miss] o [cold] según
+    el campo meta que devuelve la API. Desactivado por defecto:
+
+        LOCUST_DASHBOARD_CACHE_WEIGHT=1 locust -f locustfile.py
+    """
+    weight = int(os.environ.get("LOCUST_DASHBOARD_CACHE_WEIGHT", "0"))
+    abstract = weight <= 0
+
+    def get_dashboard(self, path, label, params=None):
+        if not self.is_authenticated():
+            return
+        with self.client.get(
+            path,
+            headers=self.get_headers(),
+            params=params,
+            catch_response=True,
+            name=f"{label} [cold]"
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f"❌ Código {response.status_code}")
+                return
+            meta = response.json().get("meta", {})
+            if not params:
+                response.request_meta["name"] = f"{label} [cache {meta.get('cache', 'miss')}]"
+
+    @task(4)
+    def kpis_cached(self):
+        self.get_dashboard("/api/dashboard/kpis", "Dashboard KPIs")
+
+    @task(4)
+    def charts_cached(self):
+        self.get_dashboard("/api/dashboard/charts", "Dashboard Charts")
+
+    @task(1)
+    def kpis_cold(self):
+        self.get_dashboard("/api/dashboard/kpis", "Dashboard KPIs", {"source": "live", "cache": "false"})
+
+    @task(1)
+    def charts_cold(self):
+        self.get_dashboard("/api/dashboard/charts", "Dashboard Charts", {"source": "live", "cache": "false"})
+
+
+# ============================================================
+# 8. DEEP PAGING (offset vs cursor)
+# ============================================================
+
+DEEP_PAGING_LIMIT = 50
+DEEP_PAGING_MAX_PAGES = int(os.environ.get("LOCUST_DEEP_PAGING_PAGES", "100"))
+DEEP_PAGING_BUCKETS = (1, 10, 50, 100, 500)
+
+
+def page_bucket(page):
+    """Agrupa el número de página para que el reporte no tenga un nombre por página."""
+    for bucket in DEEP_PAGING_BUCKETS:
+        if page <= bucket:
+            return f"p<={bucket}"
+    return f"p>{DEEP_PAGING_BUCKETS[-1]}"
+
+
+class DeepPagingUser(CMSUser):
+    """
+    Recorre listados grandes página por página con paginación por offset
+    (LIMIT/OFFSET + COUNT) y por cursor (keyset, sigue nextCursor).
+    Cada request se reporta como "<listado> [modo/total p<=N]" para comparar
+    la latencia según la profundidad. Desactivado por defecto:
+
+        LOCUST_DEEP_PAGING_WEIGHT=1 locust -f locustfile.py
+
+    LOCUST_DEEP_PAGING_PAGES limita cuántas páginas recorre cada tarea.
+    """
+    weight = int(os.environ.get("LOCUST_DEEP_PAGING_WEIGHT", "0"))
+    abstract = weight <= 0
+
+    def walk(self, path, label, mode, total):
+        cursor = None
+        for page in range(1, DEEP_PAGING_MAX_PAGES + 1):
+            if not self.is_authenticated():
+                return
+            params = {"limit": DEEP_PAGING_LIMIT, "total": total}
+            if mode == "cursor":
+                params["pagination"] = "cursor"
+                if cursor:
+                    params["cursor"] = cursor
+            else:
+                params["offset"] = (page - 1) * DEEP_PAGING_LIMIT
+
+            with self.client.get(
+                path,
+                headers=self.get_headers(),
+                params=params,
+                catch_response=True,
+                name=f"{label} [{mode}/{total} {page_bucket(page)}]"
+            ) as response:
+                if response.status_code != 200:
+                    response.failure(f"❌ Código {response.status_code}")
+                    return
+                pagination = response.json().get("pagination", {})
+
+            if not pagination.get("hasMore"):
+                return
+            cursor = pagination.get("nextCursor")
+
+    @task(2)
+    def audit_offset(self):
+        self.walk("/api/audit", "List Audit Logs", "offset", "exact")
+
+    @task(2)
+    def audit_cursor(self):
+        self.walk("/api/audit", "List Audit Logs", "cursor", "none")
+
+    @task(1)
+    def audit_cursor_estimate(self):
+        self.walk("/api/audit", "List Audit Logs", "cursor", "estimate")
+
+    @task(2)
+    def appointments_offset(self):
+        self.walk("/api/appointments/citas", "List Appointments", "offset", "exact")
+
+    @task(2)
+    def appointments_cursor(self):
+        self.walk("/api/appointments/citas", "List Appointments", "cursor", "none")
+
+
+# ============================================================
+# 9. WRITE HEAVY (crear/actualizar citas y consultas)
+# ============================================================
+
+class WriteHeavyUser(CMSUser):
+    """
+    Carga de escritura: crea citas y consultas y luego las actualiza. Cada
+    operación genera un registro de auditoría, así que sirve para comparar
+    el escritor de auditoría por lotes contra AUDIT_ASYNC=false.
+    Desactivado por defecto:
+
+        LOCUST_WRITE_HEAVY_WEIGHT=1 locust -f locustfile.py
+
+    Los registros creados se quedan en la base (usar una base de pruebas).
+    """
+    weight = int(os.environ.get("LOCUST_WRITE_HEAVY_WEIGHT", "0"))
+    abstract = weight <= 0
+    wait_time = think_time(0.5, 1.5)
+
+    def on_start(self):
+        super().on_start()
+        self.created_appointments = []
+        self.created_consultations = []
+
+    def appointment_payload(self):
+        start = datetime.now() + timedelta(
+            days=self.rng.randint(1, 60),
+            hours=self.rng.randint(8, 17),
+        )
+        return {
+            "paciente_id": self.ids.pick("pacientes"),
+            "medico_id": self.ids.pick("medicos"),
+            "fecha_inicio": start.isoformat(timespec="minutes"),
+            "fecha_fin": (start + timedelta(minutes=30)).isoformat(timespec="minutes"),
+        }
+
+    def create(self, path, payload, name, created):
+        with self.client.post(
+            path,
+            json=payload,
+            headers=self.get_headers(),
+            catch_response=True,
+            name=name
+        ) as response:
+            if response.status_code != 201:
+                response.failure(f"❌ Código {response.status_code}")
+                return None
+            new_id = response.json().get("id")
+            created.append((new_id, payload))
+            return new_id
+
+    @task(4)
+    def create_appointment(self):
+        if not self.is_authenticated():
+            return
+        self.create(
+            "/api/appointments/citas",
+            self.appointment_payload(),
+            "Create Appointment",
+            self.created_appointments
+        )
+
+    @task(3)
+    def update_appointment(self):
+        if not self.is_authenticated() or not self.created_appointments:
+            return
+        appointment_id, appointment = self.rng.choice(self.created_appointments)
+        # Reagendar: mismo paciente y médico, nueva fecha
+        payload = {
+            **self.appointment_payload(),
+            "paciente_id": appointment["paciente_id"],
+            "medico_id": appointment["medico_id"],
+        }
+        self.client.put(
+            f"/api/appointments/citas/{appointment_id}",
+            json=payload,
+            headers=self.get_headers(),
+            name="Update Appointment"
+        )
+
+    @task(3)
+    def create_consultation(self):
+        if not self.is_authenticated() or not self.created_appointments:
+            return
+        appointment_id, appointment = self.rng.choice(self.created_appointments)
+        self.create(
+            "/api/appointments/consultas",
+            {
+                "cita_id": appointment_id,
+                "id_paciente": appointment["paciente_id"],
+                "id_medico": appointment["medico_id"],
+                "fecha_hora": appointment["fecha_inicio"],
+                "narrativa": "Consulta generada por prueba de carga",
+            },
+            "Create Consultation",
+            self.created_consultations
+        )
+
+    @task(3)
+    def update_consultation(self):
+        if not self.is_authenticated() or not self.created_consultations:
+            return
+        consultation_id, payload = self.rng.choice(self.created_consultations)
+        self.client.put(
+            f"/api/appointments/consultas/{consultation_id}",
+            json={
+                "fecha_hora": payload["fecha_hora"],
+                "narrativa": payload["narrativa"],
+                "diagnostico_final": f"Diagnóstico de prueba {self.rng.randint(1, 1000)}",
+            },
+            headers=self.get_headers(),
+            name="Update Consultation"
+        )
+
+
+# ============================================================
+# 10. SEARCH (filtros ?search sobre datos grandes)
+# ============================================================
+
+# Mezcla de términos: comunes, poco comunes, sin resultados y cortos
+# (menos de 3 caracteres no usan el índice de trigramas)
+SEARCH_TERMS = [
+    t.strip() for t in os.environ.get(
+        "LOCUST_SEARCH_TERMS",
+        "mar,jose,garcia,lopez,hern,ana,dr_,gmail,example.com,pdf,image,CREATE,UPDATE,CITA,zzqx,al"
+    ).split(",") if t.strip()
+]
+
+
+class SearchUser(CMSUser):
+    """
+    Ejecuta búsquedas (?search) en los listados de usuarios, pacientes,
+    médicos, archivos, catálogos y auditoría. Pensado para correr sobre una
+    base sembrada a escala con y sin cms_db/search_indexes.sql.
+    Desactivado por defecto:
+
+        LOCUST_SEARCH_WEIGHT=1 locust -f locustfile.py
+
+    LOCUST_SEARCH_TERMS (separados por coma) cambia los términos buscados.
+    """
+    weight = int(os.environ.get("LOCUST_SEARCH_WEIGHT", "0"))
+    abstract = weight <= 0
+
+    def search(self, path, name, field="search"):
+        if not self.is_authenticated():
+            return
+        params = {"limit": 20, "offset": 0, field: self.rng.choice(SEARCH_TERMS)}
+        self.client.get(path, headers=self.get_headers(), params=params, name=name)
+
+    @task(3)
+    def search_users(self):
+        self.search("/api/users", "Search Users")
+
+    @task(4)
+    def search_patients(self):
+        self.search("/api/patients", "Search Patients")
+
+    @task(3)
+    def search_doctors(self):
+        self.search("/api/doctors", "Search Doctors")
+
+    @task(2)
+    def search_files(self):
+        self.search("/api/files", "Search Files")
+
+    @task(1)
+    def search_catalog(self):
+        self.search("/api/catalogs/especialidades", "Search Catalog")
+
+    @task(2)
+    def search_audit(self):
+        self.search("/api/audit", "Search Audit Logs", field="entidad")
+
+
+# ============================================================
+# 11. CATALOG CACHE (ETag / If-None-Match)
 # ============================================================
 
+CATALOG_PATHS = [
+    "/api/catalogs/especialidades",
+    "/api/catalogs/tipos-sangre",
+    "/api/catalogs/ocupaciones",
+    "/api/catalogs/estado-civil",
+    "/api/catalogs/estado-cita",
+    "/api/catalogs/tipo-cita",
+    "/api/catalogs/estado-consulta",
+]
+
+
+class CatalogBrowsingUser(CMSUser):
+    """
+    Navega los catálogos como lo haría el frontend: guarda el ETag de cada
+    respuesta y lo reenvía en If-None-Match. Cada request se reporta como
+    "Catalog [200 HIT|MISS]" o "Catalog [304]" para medir los round trips
+    y bytes ahorrados; "Catalog [cold]" usa ?cache=false como referencia.
+    Desactivado por defecto:
+
+        LOCUST_CATALOG_WEIGHT=1 locust -f locustfile.py
+    """
+    weight = int(os.environ.get("LOCUST_CATALOG_WEIGHT", "0"))
+    abstract = weight <= 0
+
+    def on_start(self):
+        super().on_start()
+        self.etags = {}
+
+    def browse(self, path, params=None, revalidate=True):
+        if not self.is_authenticated():
+            return
+        headers = self.get_headers()
+        key = (path, tuple(sorted((params or {}).items())))
+        if revalidate and key in self.etags:
+            headers["If-None-Match"] = self.etags[key]
+
+        with self.client.get(
+            path,
+            headers=headers,
+            params=params,
+            catch_response=True,
+            name="Catalog [cold]"
+        ) as response:
+            if response.status_code == 304:
+                response.request_meta["name"] = "Catalog [304]"
+                response.success()
+                return
+            if response.status_code != 200:
+                response.failure(f"❌ Código {response.status_code}")
+                return
+            if revalidate:
+                self.etags[key] = response.headers.get("ETag")
+                cache = response.headers.get("X-Cache", "MISS")
+                response.request_meta["name"] = f"Catalog [200 {cache}]"
+
+    @task(6)
+    def browse_catalog(self):
+        self.browse(self.rng.choice(CATALOG_PATHS))
+
+    @task(2)
+    def browse_catalog_page(self):
+        self.browse(self.rng.choice(CATALOG_PATHS), {"limit": 5, "offset": self.rng.choice([0, 5])})
+
+    @task(1)
+    def browse_catalog_cold(self):
+        self.browse(self.rng.choice(CATALOG_PATHS), {"cache": "false"}, revalidate=False)
+
+
+# ============================================================
+# 12. LOAD SHAPES (modelo abierto y búsqueda de capacidad)
+# ============================================================
+
+# Locust usa la primera LoadTestShape no abstracta del locustfile; solo se
+# define la elegida con LOCUST_SHAPE (constant, step, spike, soak, diurnal,
+# capacity). Sin LOCUST_SHAPE todo sigue en modelo cerrado con -u/-r/-t:
+#
+#     LOCUST_SHAPE=capacity locust -f locustfile.py --headless --slo-p95-ms 400
+if LOCUST_SHAPE:
+    class CMSLoadShape(SHAPES[LOCUST_SHAPE]):
+        """Perfil de carga elegido con LOCUST_SHAPE (ver load_shapes.py)."""
+
+
+# ============================================================
+# 13. EVENT LOGS
+# ============================================================
+
+@events.init_command_line_parser.add_listener
+def on_init_parser(parser):
+    parser.add_argument(
+        "--skip-token-prewarm",
+        action="store_true",
+        default=False,
+        help="No pre-calentar el pool de tokens; cada usuario hace su propio login",
+    )
+    parser.add_argument(
+        "--token-cache-file",
+        type=str,
+        default=TOKEN_POOL.cache_file,
+        help="Archivo donde se guardan los tokens pre-calentados con su expiración",
+    )
+    parser.add_argument(
+        "--token-refresh-margin",
+        type=int,
+        default=TOKEN_POOL.refresh_margin,
+        help="Segundos antes de la expiración en que un token se considera vencido",
+    )
+    parser.add_argument(
+        "--token-prewarm-concurrency",
+        type=int,
+        default=10,
+        help="Logins simultáneos durante el pre-calentamiento",
+    )
+    parser.add_argument(
+        "--id-catalog-file",
+        type=str,
+        default=DEFAULT_CATALOG_FILE,
+        help="Snapshot de IDs reales generado con export-id-catalog.js",
+    )
+    parser.add_argument(
+        "--workload-seed",
+        type=int,
+        default=WORKLOAD.seed,
+        help="Semilla del generador de carga; misma semilla = misma secuencia por usuario",
+    )
+    parser.add_argument(
+        "--zipf-s",
+        type=float,
+        default=WORKLOAD.zipf_s,
+        help="Exponente Zipf para elegir IDs (0 = uniforme, mayor = llaves más calientes)",
+    )
+    parser.add_argument(
+        "--target-rps",
+        type=float,
+        default=0,
+        help="Tasa objetivo para estimar cuántos workers necesita el generador",
+    )
+    parser.add_argument(
+        "--shape-rps",
+        type=float,
+        default=None,
+        help="LOCUST_SHAPE: tasa objetivo (constant, soak), base (spike) o pico (diurnal)",
+    )
+    parser.add_argument(
+        "--shape-duration",
+        type=int,
+        default=None,
+        help="LOCUST_SHAPE: duración en segundos (por defecto la del perfil)",
+    )
+    parser.add_argument(
+        "--shape-step-rps",
+        type=float,
+        default=None,
+        help="LOCUST_SHAPE step/capacity: req/s que sube cada escalón (10 por defecto)",
+    )
+    parser.add_argument(
+        "--shape-step-time",
+        type=int,
+        default=None,
+        help="LOCUST_SHAPE step/capacity: segundos por escalón (60 por defecto)",
+    )
+    parser.add_argument(
+        "--slo-endpoints",
+        type=str,
+        default=DEFAULT_SLO_ENDPOINTS,
+        help="LOCUST_SHAPE capacity: endpoints (nombre en Locust) que deben cumplir el SLO",
+    )
+    parser.add_argument(
+        "--slo-p95-ms",
+        type=float,
+        default=500,
+        help="LOCUST_SHAPE capacity: p95 máximo permitido en cada endpoint del SLO",
+    )
+    parser.add_argument(
+        "--slo-error-rate",
+        type=float,
+        default=0.01,
+        help="LOCUST_SHAPE capacity: tasa de error máxima (0.01 = 1%%)",
+    )
+    parser.add_argument(
+        "--metrics-token",
+        type=str,
+        default=server_metrics.METRICS_TOKEN,
+        help="Valor de METRICS_TOKEN del backend para leer/reiniciar /health/metrics",
+    )
+    parser.add_argument(
+        "--benchmark-report",
+        type=str,
+        default="",
+        help="Guardar p50/p95/p99 e histograma por endpoint en este JSON (lo usa benchmark.py)",
+    )
+
+
+# Métricas de /health/metrics y una URL de ejemplo por endpoint de Locust,
+# para cruzar cada endpoint con las consultas SQL de su ruta en el backend
+SERVER_METRICS = {}
+ENDPOINT_URLS = {}
+
+
+def on_endpoint_urls_message(environment, msg, **kwargs):
+    for key, path in msg.data.items():
+        ENDPOINT_URLS.setdefault(key, path)
+
+
+def on_generator_cpu_message(environment, msg, **kwargs):
+    GENERATOR_CPU.add(msg.node_id, msg.data)
+
+
+def on_shard_message(environment, msg, **kwargs):
+    data = msg.data
+    WORKLOAD.configure(
+        data["users"], data["ids"], data["index"], data["count"], data["seed"], data["zipf_s"]
+    )
+    TOKEN_POOL.restore(data["tokens"])
+    print(
+        f"📦 Shard {data['index'] + 1}/{data['count']} recibido del master: "
+        f"{len(WORKLOAD.users)} cuentas, {len(TOKEN_POOL)} tokens"
+    )
+
+
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    options = environment.parsed_options
+    if options:
+        TOKEN_POOL.cache_file = options.token_cache_file
+        TOKEN_POOL.refresh_margin = options.token_refresh_margin
+        WORKLOAD.seed = options.workload_seed
+        WORKLOAD.zipf_s = options.zipf_s
+
+    if isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message("shard", on_shard_message)
+        return
+    if isinstance(environment.runner, MasterRunner):
+        environment.runner.register_message("endpoint_urls", on_endpoint_urls_message)
+        environment.runner.register_message("generator_cpu", on_generator_cpu_message)
+
+    catalog_file = options.id_catalog_file if options else DEFAULT_CATALOG_FILE
+    WORKLOAD.configure(load_users_from_csv(), load_id_catalog(catalog_file))
+
+
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
     print("🚀 Starting CMS API Load Test")
     print(f"📍 Target host: {environment.host}")
+    print(f"⚙️ Motor HTTP: {LOCUST_ENGINE} ({EngineUser.__name__})")
+    if LOCUST_SHAPE:
+        print(f"📐 Perfil de carga: {LOCUST_SHAPE} (modelo abierto)")
+    GENERATOR_CPU.reset()
+
+    # Los workers reciben cuentas, IDs y tokens del master; solo el master/local pre-calienta
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    options = environment.parsed_options
+    if environment.host:
+        token = options.metrics_token if options else server_metrics.METRICS_TOKEN
+        server_metrics.reset(environment.host, token)
+    if WORKLOAD.users and environment.host and not (options and options.skip_token_prewarm):
+        concurrency = options.token_prewarm_concurrency if options else 10
+        reused, fresh, failed = TOKEN_POOL.prewarm(environment.host, WORKLOAD.users, concurrency)
+        print(f"🔑 Pool de tokens listo: {reused} reutilizados del cache, {fresh} logins nuevos")
+        if failed:
+            print(f"⚠️ {len(failed)} cuentas sin token (harán login propio): {', '.join(failed[:5])}")
+
+    if isinstance(environment.runner, MasterRunner):
+        worker_ids = sorted(environment.runner.clients.keys())
+        for worker_id, data in zip(worker_ids, WORKLOAD.shards(len(worker_ids))):
+            usernames = [account_credentials(row)["username"] for row in data["users"]]
+            data.update(
+                seed=WORKLOAD.seed,
+                zipf_s=WORKLOAD.zipf_s,
+                tokens=TOKEN_POOL.snapshot(usernames),
+            )
+            environment.runner.send_message("shard", data, client_id=worker_id)
+        print(f"📦 Datos repartidos sin traslape entre {len(worker_ids)} workers")
 
 @events.test_stop.add_listener
 def on_test_stop(environment, **kwargs):
     print("✅ CMS API Load Test Completed")
 
+    if isinstance(environment.runner, WorkerRunner):
+        environment.runner.send_message("endpoint_urls", ENDPOINT_URLS)
+        environment.runner.send_message("generator_cpu", GENERATOR_CPU.sample())
+        return
+    if not isinstance(environment.runner, MasterRunner):
+        GENERATOR_CPU.add("local", GENERATOR_CPU.sample())
+    if environment.host:
+        options = environment.parsed_options
+        token = options.metrics_token if options else server_metrics.METRICS_TOKEN
+        SERVER_METRICS.update(server_metrics.fetch(environment.host, token) or {})
+        server_metrics.print_summary(SERVER_METRICS)
+
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    # En quitting el master ya recibió las estadísticas finales de los workers
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    options = environment.parsed_options
+    generator = GENERATOR_CPU.summary(LOCUST_ENGINE, options.target_rps if options else 0)
+    generator_cpu.print_summary(generator)
+    shape = environment.shape_class.report() if LOCUST_SHAPE and environment.shape_class else None
+    if options and options.benchmark_report:
+        write_report(
+            environment, options.benchmark_report, SERVER_METRICS, ENDPOINT_URLS, generator, shape
+        )
+
 @events.request.add_listener
 def on_request(request_type, name, response_time, response_length, exception, **kwargs):
+    GENERATOR_CPU.on_request()
+    key = f"{request_type} {name}"
+    if key not in ENDPOINT_URLS and kwargs.get("url"):
+        ENDPOINT_URLS[key] = urlsplit(kwargs["url"]).path
     if exception:
         print(f"❌ Request failed: {name} - {exception}")
 
@@ -0,0 +1,105 @@
+"""
+Métricas del lado del servidor (/health/metrics) para el harness
+----------------------------------------------------------------
+
+El backend agrega cada consulta SQL por ruta Express y "forma" normalizada
+(conteo, tiempo total y máximo, filas) y expone además el estado del pool
+de pg y los contadores de la cola de auditoría y de los caches. Aquí se
+reinician esos agregados al iniciar la prueba, se leen al terminar y se
+cruzan con los endpoints de Locust para saber qué SQL hay detrás de cada
+endpoint lento.
+
+/health/metrics exige el header X-Metrics-Token (METRICS_TOKEN del backend,
+--metrics-token en Locust) o un JWT de administrador.
+"""
+
+import os
+import re
+
+import requests
+
+METRICS_PATH = "/health/metrics"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+
+def auth_headers(token):
+    return {"X-Metrics-Token": token} if token else {}
+
+
+def reset(host, token=METRICS_TOKEN, timeout=10):
+    try:
+        response = requests.delete(
+            host.rstrip("/") + METRICS_PATH, headers=auth_headers(token), timeout=timeout
+        )
+        response.raise_for_status()
+    except Exception as e:
+        print(f"⚠️ WARNING: no se pudieron reiniciar las métricas del servidor: {e}")
+
+
+def fetch(host, token=METRICS_TOKEN, timeout=10):
+    try:
+        response = requests.get(
+            host.rstrip("/") + METRICS_PATH, headers=auth_headers(token), timeout=timeout
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"⚠️ WARNING: no se pudieron leer las métricas del servidor: {e}")
+        return None
+
+
+def route_matcher(route):
+    """'GET /api/patients/:id' -> ('GET', regex que acepta /api/patients/17)."""
+    method, _, path = route.partition(" ")
+    pattern = re.sub(r":[^/]+", "[^/]+", re.escape(path.rstrip("/")))
+    return method, re.compile(f"^{pattern}/?$")
+
+
+def attach_queries(endpoints, metrics, endpoint_urls, top=5):
+    """Agrega a cada endpoint de Locust las formas SQL más costosas de su ruta."""
+    if not metrics:
+        return
+    by_route = {}
+    for entry in metrics.get("queries", []):
+        by_route.setdefault(entry["route"], []).append(entry)
+    matchers = [(route, route_matcher(route), queries) for route, queries in by_route.items()]
+
+    for endpoint in endpoints:
+        path = endpoint_urls.get(f"{endpoint['method']} {endpoint['name']}")
+        if not path:
+            continue
+        for route, (method, pattern), queries in matchers:
+            if method == endpoint["method"] and pattern.match(path):
+                endpoint["route"] = route
+                endpoint["queries"] = queries[:top]
+                break
+
+
+def print_summary(metrics, top=10):
+    if not metrics:
+        return
+    pool = metrics.get("pool", {})
+    print(
+        f"🗄️ Pool pg: total={pool.get('total')} idle={pool.get('idle')} "
+        f"waiting={pool.get('waiting')} max={pool.get('max')}"
+    )
+    audit = metrics.get("audit")
+    if audit:
+        print(
+            f"📝 Auditoría ({audit.get('mode')}): encolados={audit.get('queued')} "
+            f"escritos={audit.get('flushed')} en {audit.get('batches')} lotes "
+            f"descartados={audit.get('dropped')} fallidos={audit.get('failed')} "
+            f"pendientes={audit.get('pending')} esperas={audit.get('backpressureWaits')}"
+        )
+    for name, cache in (metrics.get("caches") or {}).items():
+        print(
+            f"🧊 Cache {name}: hits={cache.get('hits')} misses={cache.get('misses')} "
+            f"evictions={cache.get('evictions')} size={cache.get('size')} "
+            f"304={cache.get('notModified', 0)} bytes_ahorrados={cache.get('bytesSaved', 0)}"
+        )
+    print(f"🗄️ Top {top} formas SQL por tiempo total ({metrics.get('shapes', 0)} formas):")
+    for entry in metrics.get("queries", [])[:top]:
+        print(
+            f"   {entry['totalMs']:>10.1f}ms  x{entry['count']:<6} max={entry['maxMs']}ms "
+            f"rows={entry['rows']}  [{entry['route']}] {entry['sql'][:100]}"
+        )
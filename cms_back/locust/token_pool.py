@@ -0,0 +1,181 @@
+"""
+Pool de tokens JWT pre-calentado para el harness de Locust
+----------------------------------------------------------
+
+Cada login cuesta un ``bcrypt.compare`` en el backend, así que en lugar de
+que cada usuario virtual haga su propio ``/api/auth/login`` en ``on_start``:
+
+1. El master (o el runner local) hace login UNA vez por cuenta del CSV
+   antes de arrancar la prueba (fase de pre-calentamiento).
+2. Los tokens se guardan en disco junto con su expiración (claim ``exp``)
+   para reutilizarlos entre corridas y entre workers de la misma máquina.
+3. El master envía a cada worker los tokens de su shard de cuentas por
+   mensaje, así los workers remotos no necesitan el archivo.
+4. Los usuarios toman tokens del pool y solo vuelven a hacer login cuando
+   el token está por expirar.
+"""
+
+import base64
+import json
+import os
+import tempfile
+import time
+
+import requests
+
+LOGIN_PATH = "/api/auth/login"
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(__file__), ".token_cache.json")
+CACHE_VERSION = 1
+
+
+def account_credentials(row):
+    """Convierte una fila del CSV en el payload de login.
+
+    El CSV tiene email, pero el login usa username: si no viene columna
+    username se usa la parte antes del @ del email.
+    """
+    email = row.get("email") or row.get("correo") or ""
+    username = row.get("username") or (email.split("@")[0] if email else "")
+    return {"username": username, "password": row.get("password")}
+
+
+def token_expiry(token):
+    """Lee el claim ``exp`` del JWT sin verificar la firma."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+class TokenPool:
+    """Tokens por username, compartidos por todos los usuarios del proceso."""
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, refresh_margin=60):
+        self.cache_file = cache_file
+        self.refresh_margin = refresh_margin
+        self.host = None
+        self.entries = {}
+
+    # --------------------------------------------------------
+    # Estado del pool
+    # --------------------------------------------------------
+
+    def __len__(self):
+        return len(self.entries)
+
+    def is_valid(self, entry):
+        if not entry or not entry.get("token"):
+            return False
+        exp = entry.get("exp")
+        return exp is None or exp - self.refresh_margin > time.time()
+
+    def get(self, username):
+        """Devuelve el token vigente de la cuenta o None si hay que re-logear."""
+        entry = self.entries.get(username)
+        return entry if self.is_valid(entry) else None
+
+    def put(self, username, data):
+        """Guarda la respuesta de ``/api/auth/login`` en el pool."""
+        token = data.get("token")
+        user = data.get("user", {})
+        entry = {
+            "token": token,
+            "user_id": user.get("id"),
+            "username": user.get("username") or username,
+            "role": user.get("role"),
+            "exp": token_expiry(token),
+        }
+        self.entries[username] = entry
+        return entry
+
+    def snapshot(self, usernames=None):
+        """Contenido serializable del pool; opcionalmente solo ciertas cuentas."""
+        entries = self.entries
+        if usernames is not None:
+            entries = {u: entries[u] for u in usernames if u in entries}
+        return {"version": CACHE_VERSION, "host": self.host, "tokens": entries}
+
+    def restore(self, snapshot):
+        if snapshot.get("version") != CACHE_VERSION:
+            return
+        self.host = snapshot.get("host")
+        self.entries = {
+            username: entry
+            for username, entry in snapshot.get("tokens", {}).items()
+            if self.is_valid(entry)
+        }
+
+    # --------------------------------------------------------
+    # Persistencia en disco
+    # --------------------------------------------------------
+
+    def load(self, host):
+        """Carga el cache de disco si pertenece al mismo host."""
+        if not os.path.exists(self.cache_file):
+            return 0
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except Exception as e:
+            print(f"⚠️ WARNING: cache de tokens ilegible ({e}), se ignora")
+            return 0
+        if snapshot.get("host") != host:
+            return 0
+        self.restore(snapshot)
+        return len(self.entries)
+
+    def save(self):
+        """Escritura atómica para que otros procesos nunca lean un archivo a medias."""
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token_cache.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            print(f"⚠️ WARNING: no se pudo guardar el cache de tokens: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # --------------------------------------------------------
+    # Pre-calentamiento
+    # --------------------------------------------------------
+
+    def prewarm(self, host, accounts, concurrency=10, timeout=30):
+        """Hace login una vez por cada cuenta sin token vigente.
+
+        Los logins se hacen fuera del cliente de Locust para que no aparezcan
+        en las estadísticas de la prueba. Devuelve (reutilizados, nuevos, fallidos).
+        """
+        from gevent.pool import Pool
+
+        self.host = host
+        reused = self.load(host)
+        pending = [
+            creds
+            for creds in map(account_credentials, accounts)
+            if creds["username"] and not self.get(creds["username"])
+        ]
+
+        session = requests.Session()
+        url = host.rstrip("/") + LOGIN_PATH
+        failed = []
+
+        def login(creds):
+            try:
+                response = session.post(url, json=creds, timeout=timeout)
+                if response.status_code == 200 and response.json().get("token"):
+                    self.put(creds["username"], response.json())
+                    return
+                failed.append(f"{creds['username']} ({response.status_code})")
+            except Exception as e:
+                failed.append(f"{creds['username']} ({e})")
+
+        Pool(concurrency).map(login, pending)
+        self.save()
+        return reused, len(pending) - len(failed), failed
+
+
+TOKEN_POOL = TokenPool()
@@ -0,0 +1,143 @@
+"""
+Generador de carga determinista y reparto de datos entre workers
+----------------------------------------------------------------
+
+- El master reparte las cuentas de users.csv y el catálogo de IDs reales
+  (id_catalog.json, exportado con export-id-catalog.js) entre los workers
+  SIN traslape: el worker i de n recibe los elementos i, i+n, i+2n, ...
+- Cada usuario virtual obtiene su propio ``random.Random`` derivado de
+  (semilla, índice de worker, número de usuario), así dos corridas con la
+  misma semilla y el mismo número de workers generan la misma secuencia
+  de parámetros por usuario.
+- Los IDs se eligen con una distribución Zipf (pocas llaves "calientes" y
+  una cola larga) para que el comportamiento del cache sea realista.
+  Con ``zipf_s = 0`` la elección es uniforme.
+"""
+
+import bisect
+import itertools
+import json
+import os
+import random
+
+DEFAULT_CATALOG_FILE = os.path.join(os.path.dirname(__file__), "id_catalog.json")
+
+# Rangos usados cuando no existe id_catalog.json (comportamiento anterior)
+FALLBACK_RANGES = {
+    "usuarios": (1, 100),
+    "medicos": (1, 10),
+    "pacientes": (1, 50),
+}
+
+
+def load_id_catalog(file_path=DEFAULT_CATALOG_FILE):
+    """Lee el snapshot de IDs; devuelve {} si no existe."""
+    if not os.path.exists(file_path):
+        print("⚠️ WARNING: id_catalog.json no encontrado. Se usarán rangos fijos de IDs.")
+        return {}
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+        ids = {kind: sorted(values) for kind, values in catalog.get("ids", {}).items()}
+        sizes = ", ".join(f"{kind}={len(values)}" for kind, values in ids.items())
+        print(f"📌 Catálogo de IDs cargado: {sizes}")
+        return ids
+    except Exception as e:
+        print(f"❌ ERROR leyendo id_catalog.json: {e}")
+        return {}
+
+
+def shard(items, index, count):
+    """Parte ``items`` en ``count`` pedazos disjuntos y devuelve el ``index``."""
+    return list(items[index::count])
+
+
+def zipf_cumulative(size, s):
+    """Pesos acumulados de Zipf(s) para rangos 1..size."""
+    cumulative = []
+    total = 0.0
+    for rank in range(1, size + 1):
+        total += 1.0 / (rank ** s)
+        cumulative.append(total)
+    return cumulative
+
+
+class Workload:
+    """Datos y parámetros de carga del proceso actual (local o worker)."""
+
+    def __init__(self, seed=42, zipf_s=1.1):
+        self.seed = seed
+        self.zipf_s = zipf_s
+        self.index = 0
+        self.count = 1
+        self.users = []
+        self.ids = {}
+        self._hot_order = {}
+        self._cumulative = {}
+        self._user_counter = itertools.count()
+
+    def configure(self, users, ids, index=0, count=1, seed=None, zipf_s=None):
+        if seed is not None:
+            self.seed = seed
+        if zipf_s is not None:
+            self.zipf_s = zipf_s
+        self.index = index
+        self.count = count
+        self.users = users
+        self.ids = ids
+        self._user_counter = itertools.count()
+
+        # La tarea que elige Locust usa el random global: también se siembra
+        random.seed(f"{self.seed}:{self.index}")
+
+        # Qué IDs son "calientes" depende de la semilla, no del orden en la BD
+        self._hot_order = {}
+        self._cumulative = {}
+        for kind, values in ids.items():
+            order = list(values)
+            random.Random(f"{self.seed}:hot:{kind}").shuffle(order)
+            self._hot_order[kind] = order
+            self._cumulative[kind] = zipf_cumulative(len(order), self.zipf_s)
+
+    def shards(self, count):
+        """Reparto para ``count`` workers (lo usa el master)."""
+        return [
+            {
+                "index": index,
+                "count": count,
+                "users": shard(self.users, index, count),
+                "ids": {kind: shard(values, index, count) for kind, values in self.ids.items()},
+            }
+            for index in range(count)
+        ]
+
+    def new_user(self):
+        """Cuenta y generador de números para el siguiente usuario virtual.
+
+        Las cuentas se asignan en round-robin sobre el shard del worker, así
+        dos usuarios virtuales no comparten cuenta mientras haya suficientes.
+        """
+        number = next(self._user_counter)
+        rng = random.Random(f"{self.seed}:{self.index}:{number}")
+        account = self.users[number % len(self.users)] if self.users else None
+        return account, IdPicker(self, rng)
+
+
+class IdPicker:
+    """Elige IDs reales del shard con distribución Zipf para un usuario."""
+
+    def __init__(self, workload, rng):
+        self.workload = workload
+        self.rng = rng
+
+    def pick(self, kind):
+        order = self.workload._hot_order.get(kind)
+        if not order:
+            low, high = FALLBACK_RANGES[kind]
+            return self.rng.randint(low, high)
+        cumulative = self.workload._cumulative[kind]
+        position = bisect.bisect_left(cumulative, self.rng.random() * cumulative[-1])
+        return order[min(position, len(order) - 1)]
+
+
+WORKLOAD = Workload()
@@ -1,4 +1,5 @@
 const { Pool } = require("pg");
+const { recordQuery } = require("../utils/queryMetrics");
 require("dotenv").config();
 
 const pool = new Pool({
@@ -22,15 +23,23 @@ pool.on("error", (err) => {
   process.exit(-1);
 });
 
+// Per-statement logging is opt-in: 0 = off (default), 1 = every query,
+// 0.01 = roughly 1% of queries. Aggregates are always collected.
+const LOG_SAMPLE_RATE = parseFloat(process.env.DB_QUERY_LOG_SAMPLE_RATE || "0");
+
 // Helper function for queries
 const query = async (text, params) => {
-  const start = Date.now();
+  const start = process.hrtime.bigint();
   try {
     const res = await pool.query(text, params);
-    const duration = Date.now() - start;
-    console.log("Executed query", { text, duration, rows: res.rowCount });
+    const duration = Number(process.hrtime.bigint() - start) / 1e6;
+    recordQuery(text, duration, res.rowCount);
+    if (LOG_SAMPLE_RATE > 0 && Math.random() < LOG_SAMPLE_RATE) {
+      console.log("Executed query", { text, duration, rows: res.rowCount });
+    }
     return res;
   } catch (error) {
+    recordQuery(text, Number(process.hrtime.bigint() - start) / 1e6, 0, true);
     console.error("Query error:", error);
     throw error;
   }
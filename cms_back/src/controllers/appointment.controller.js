@@ -1,7 +1,22 @@
 const { query } = require("../config/database");
 const { logAudit } = require("../utils/auditLogger");
+const {
+  parsePagination,
+  cursorValue,
+  countTotal,
+  buildPage,
+} = require("../utils/pagination");
+const { catalogNames } = require("../utils/catalogCache");
 
 // CITA
+const APPOINTMENT_WHERE = `
+       WHERE ($1::timestamptz IS NULL OR c.fecha_inicio >= $1::timestamptz)
+         AND ($2::timestamptz IS NULL OR c.fecha_inicio <  $2::timestamptz)
+         AND ($3::int IS NULL OR c.id_estado_cita = $3::int)
+         AND ($4::int IS NULL OR c.id_tipo_cita   = $4::int)
+         AND ($5::int IS NULL OR c.medico_id      = $5::int)
+         AND ($6::int IS NULL OR c.paciente_id    = $6::int)`;
+
 const getAppointments = async (req, res, next) => {
   try {
     const {
@@ -11,67 +26,56 @@ const getAppointments = async (req, res, next) => {
       id_tipo_cita,
       medico_id,
       paciente_id,
-      limit = 10,
-      offset = 0,
     } = req.query;
+    const page = parsePagination(req.query, ["timestamp", "int"]);
+
+    const filters = [
+      fecha_desde ?? null,
+      fecha_hasta ?? null,
+      id_estado_cita ?? null,
+      id_tipo_cita ?? null,
+      medico_id ?? null,
+      paciente_id ?? null,
+    ];
+
+    // Keyset on (fecha_inicio, id): $7/$8 come from the previous page's cursor.
+    // Estado/tipo names come from the catalog cache instead of a join.
+    const [result, total, estados, tipos] = await Promise.all([
+      query(
+        `SELECT c.id, c.fecha_inicio, c.fecha_fin,
+                NULL::text AS estado, NULL::text AS tipo,
+                p.id AS paciente_id, p.nombre AS paciente,
+                m.id AS medico_id, m.nombre AS medico,
+                c.id_estado_cita, c.id_tipo_cita,
+                c.fecha_inicio::text AS cursor_key
+         FROM cita c
+         LEFT JOIN paciente    p  ON p.id = c.paciente_id
+         LEFT JOIN medico      m  ON m.id = c.medico_id
+         ${APPOINTMENT_WHERE}
+           AND ($7::timestamptz IS NULL OR (c.fecha_inicio, c.id) < ($7::timestamptz, $8::int))
+         ORDER BY c.fecha_inicio DESC, c.id DESC
+         LIMIT $9 OFFSET $10`,
+        [
+          ...filters,
+          cursorValue(page, 0),
+          cursorValue(page, 1),
+          page.limit + 1,
+          page.offset,
+        ]
+      ),
+      countTotal(page, `FROM cita c ${APPOINTMENT_WHERE}`, filters),
+      catalogNames("ESTADO_CITA"),
+      catalogNames("TIPO_CITA"),
+    ]);
+
+    for (const row of result.rows) {
+      row.estado = estados.get(row.id_estado_cita) ?? null;
+      row.tipo = tipos.get(row.id_tipo_cita) ?? null;
+    }
 
-    const result = await query(
-      `SELECT c.id, c.fecha_inicio, c.fecha_fin,
-              ec.nombre AS estado, tc.nombre AS tipo,
-              p.id AS paciente_id, p.nombre AS paciente,
-              m.id AS medico_id, m.nombre AS medico,
-              c.id_estado_cita, c.id_tipo_cita
-       FROM cita c
-       LEFT JOIN estado_cita ec ON ec.id = c.id_estado_cita
-       LEFT JOIN tipo_cita   tc ON tc.id = c.id_tipo_cita
-       LEFT JOIN paciente    p  ON p.id = c.paciente_id
-       LEFT JOIN medico      m  ON m.id = c.medico_id
-       WHERE ($1::timestamptz IS NULL OR c.fecha_inicio >= $1::timestamptz)
-         AND ($2::timestamptz IS NULL OR c.fecha_inicio <  $2::timestamptz)
-         AND ($3::int IS NULL OR c.id_estado_cita = $3::int)
-         AND ($4::int IS NULL OR c.id_tipo_cita   = $4::int)
-         AND ($5::int IS NULL OR c.medico_id      = $5::int)
-         AND ($6::int IS NULL OR c.paciente_id    = $6::int)
-       ORDER BY c.fecha_inicio DESC
-       LIMIT $7 OFFSET $8`,
-      [
-        fecha_desde ?? null,
-        fecha_hasta ?? null,
-        id_estado_cita ?? null,
-        id_tipo_cita ?? null,
-        medico_id ?? null,
-        paciente_id ?? null,
-        limit,
-        offset,
-      ]
-    );
-
-    const countResult = await query(
-      `SELECT COUNT(*) AS total FROM cita c
-       WHERE ($1::timestamptz IS NULL OR c.fecha_inicio >= $1::timestamptz)
-         AND ($2::timestamptz IS NULL OR c.fecha_inicio <  $2::timestamptz)
-         AND ($3::int IS NULL OR c.id_estado_cita = $3::int)
-         AND ($4::int IS NULL OR c.id_tipo_cita   = $4::int)
-         AND ($5::int IS NULL OR c.medico_id      = $5::int)
-         AND ($6::int IS NULL OR c.paciente_id    = $6::int)`,
-      [
-        fecha_desde ?? null,
-        fecha_hasta ?? null,
-        id_estado_cita ?? null,
-        id_tipo_cita ?? null,
-        medico_id ?? null,
-        paciente_id ?? null,
-      ]
+    res.json(
+      buildPage(result.rows, page, total, (row) => [row.cursor_key, row.id])
     );
-
-    res.json({
-      data: result.rows,
-      pagination: {
-        total: parseInt(countResult.rows[0].total),
-        limit: parseInt(limit),
-        offset: parseInt(offset),
-      },
-    });
   } catch (error) {
     next(error);
   }
@@ -177,6 +181,13 @@ const deleteAppointment = async (req, res, next) => {
 };
 
 // CONSULTA
+const CONSULTATION_WHERE = `
+       WHERE ($1::timestamptz IS NULL OR co.fecha_hora >= $1::timestamptz)
+         AND ($2::timestamptz IS NULL OR co.fecha_hora <  $2::timestamptz)
+         AND ($3::int IS NULL OR co.id_estado_consulta = $3::int)
+         AND ($4::int IS NULL OR co.id_medico = $4::int)
+         AND ($5::int IS NULL OR co.id_paciente = $5::int)`;
+
 const getConsultations = async (req, res, next) => {
   try {
     const {
@@ -185,66 +196,56 @@ const getConsultations = async (req, res, next) => {
       id_estado_consulta,
       medico_id,
       paciente_id,
-      limit = 10,
-      offset = 0,
     } = req.query;
+    const page = parsePagination(req.query, ["timestamp", "int"]);
+
+    const filters = [
+      fecha_desde ?? null,
+      fecha_hasta ?? null,
+      id_estado_consulta ?? null,
+      medico_id ?? null,
+      paciente_id ?? null,
+    ];
 
     // Query to get all consultations - using uppercase table names to match database
-    const result = await query(
-      `SELECT co.id, co.fecha_hora, 
-              co.cita_id, 
-              co.narrativa, co.diagnostico_final, co.id_episodio, 
-              co.id_estado_consulta, co.mongo_consulta_id,
-              co.id_paciente, co.id_medico,
-              ecn.nombre AS estado_consulta,
-              p.nombre AS paciente,
-              m.nombre AS medico
-       FROM CONSULTA co
-       LEFT JOIN ESTADO_CONSULTA ecn ON ecn.id = co.id_estado_consulta
-       LEFT JOIN PACIENTE p ON p.id = co.id_paciente
-       LEFT JOIN MEDICO m ON m.id = co.id_medico
-       WHERE ($1::timestamptz IS NULL OR co.fecha_hora >= $1::timestamptz)
-         AND ($2::timestamptz IS NULL OR co.fecha_hora <  $2::timestamptz)
-         AND ($3::int IS NULL OR co.id_estado_consulta = $3::int)
-         AND ($4::int IS NULL OR co.id_medico = $4::int)
-         AND ($5::int IS NULL OR co.id_paciente = $5::int)
-       ORDER BY co.fecha_hora DESC
-       LIMIT $6 OFFSET $7`,
-      [
-        fecha_desde ?? null,
-        fecha_hasta ?? null,
-        id_estado_consulta ?? null,
-        medico_id ?? null,
-        paciente_id ?? null,
-        limit,
-        offset,
-      ]
-    );
+    // Keyset on (fecha_hora, id): $6/$7 come from the previous page's cursor
+    const [result, total, estados] = await Promise.all([
+      query(
+        `SELECT co.id, co.fecha_hora, 
+                co.cita_id, 
+                co.narrativa, co.diagnostico_final, co.id_episodio, 
+                co.id_estado_consulta, co.mongo_consulta_id,
+                co.id_paciente, co.id_medico,
+                NULL::text AS estado_consulta,
+                p.nombre AS paciente,
+                m.nombre AS medico,
+                co.fecha_hora::text AS cursor_key
+         FROM CONSULTA co
+         LEFT JOIN PACIENTE p ON p.id = co.id_paciente
+         LEFT JOIN MEDICO m ON m.id = co.id_medico
+         ${CONSULTATION_WHERE}
+           AND ($6::timestamptz IS NULL OR (co.fecha_hora, co.id) < ($6::timestamptz, $7::int))
+         ORDER BY co.fecha_hora DESC, co.id DESC
+         LIMIT $8 OFFSET $9`,
+        [
+          ...filters,
+          cursorValue(page, 0),
+          cursorValue(page, 1),
+          page.limit + 1,
+          page.offset,
+        ]
+      ),
+      countTotal(page, `FROM CONSULTA co ${CONSULTATION_WHERE}`, filters),
+      catalogNames("ESTADO_CONSULTA"),
+    ]);
+
+    for (const row of result.rows) {
+      row.estado_consulta = estados.get(row.id_estado_consulta) ?? null;
+    }
 
-    const countResult = await query(
-      `SELECT COUNT(*) AS total FROM CONSULTA co
-       WHERE ($1::timestamptz IS NULL OR co.fecha_hora >= $1::timestamptz)
-         AND ($2::timestamptz IS NULL OR co.fecha_hora <  $2::timestamptz)
-         AND ($3::int IS NULL OR co.id_estado_consulta = $3::int)
-         AND ($4::int IS NULL OR co.id_medico = $4::int)
-         AND ($5::int IS NULL OR co.id_paciente = $5::int)`,
-      [
-        fecha_desde ?? null,
-        fecha_hasta ?? null,
-        id_estado_consulta ?? null,
-        medico_id ?? null,
-        paciente_id ?? null,
-      ]
+    res.json(
+      buildPage(result.rows, page, total, (row) => [row.cursor_key, row.id])
     );
-
-    res.json({
-      data: result.rows,
-      pagination: {
-        total: parseInt(countResult.rows[0].total),
-        limit: parseInt(limit),
-        offset: parseInt(offset),
-      },
-    });
   } catch (error) {
     next(error);
   }
@@ -1,64 +1,58 @@
 const { query } = require("../config/database");
+const {
+  parsePagination,
+  cursorValue,
+  countTotal,
+  buildPage,
+} = require("../utils/pagination");
+const { createFilter } = require("../utils/search");
 
 const getAuditLogs = async (req, res, next) => {
   try {
-    const {
-      entidad,
-      accion,
-      fecha_desde,
-      fecha_hasta,
-      usuario_id,
-      limit = 10,
-      offset = 0,
-    } = req.query;
+    const { entidad, accion, fecha_desde, fecha_hasta, usuario_id } = req.query;
+    const page = parsePagination(req.query, ["timestamp", "int"]);
 
-    const result = await query(
-      `SELECT au.id, au.usuario_id, u.username, au.accion, au.entidad, au.entidad_id,
-              au.fecha_hora, au.detalle
-       FROM AUDITORIA au
-       LEFT JOIN USUARIO u ON u.id = au.usuario_id
-       WHERE (COALESCE($1::text, '') = '' OR au.entidad ILIKE '%' || COALESCE($1::text,'') || '%')
-         AND (COALESCE($2::text, '') = '' OR au.accion  ILIKE '%' || COALESCE($2::text,'') || '%')
-         AND ($3::timestamptz IS NULL OR au.fecha_hora >= $3::timestamptz)
-         AND ($4::timestamptz IS NULL OR au.fecha_hora <  $4::timestamptz)
-         AND ($5::int IS NULL OR au.usuario_id = $5::int)
-       ORDER BY au.fecha_hora DESC
-       LIMIT $6 OFFSET $7`,
-      [
-        entidad ?? null,
-        accion ?? null,
-        fecha_desde ?? null,
-        fecha_hasta ?? null,
-        usuario_id ?? null,
-        limit,
-        offset,
-      ]
-    );
+    const filter = createFilter();
+    filter.search(entidad, ["au.entidad"]);
+    filter.search(accion, ["au.accion"]);
+    if (fecha_desde) {
+      filter.add(`au.fecha_hora >= ${filter.param(fecha_desde)}::timestamptz`);
+    }
+    if (fecha_hasta) {
+      filter.add(`au.fecha_hora < ${filter.param(fecha_hasta)}::timestamptz`);
+    }
+    if (usuario_id) {
+      filter.add(`au.usuario_id = ${filter.param(usuario_id)}::int`);
+    }
 
-    const countResult = await query(
-      `SELECT COUNT(*) AS total FROM AUDITORIA au
-       WHERE (COALESCE($1::text, '') = '' OR au.entidad ILIKE '%' || COALESCE($1::text,'') || '%')
-         AND (COALESCE($2::text, '') = '' OR au.accion  ILIKE '%' || COALESCE($2::text,'') || '%')
-         AND ($3::timestamptz IS NULL OR au.fecha_hora >= $3::timestamptz)
-         AND ($4::timestamptz IS NULL OR au.fecha_hora <  $4::timestamptz)
-         AND ($5::int IS NULL OR au.usuario_id = $5::int)`,
-      [
-        entidad ?? null,
-        accion ?? null,
-        fecha_desde ?? null,
-        fecha_hasta ?? null,
-        usuario_id ?? null,
-      ]
-    );
+    const countFromWhere = `FROM AUDITORIA au ${filter.where()}`;
+    const countParams = [...filter.params];
 
-    res.json({
-      data: result.rows,
-      pagination: {
-        total: parseInt(countResult.rows[0].total),
-        limit: parseInt(limit),
-        offset: parseInt(offset),
-      },
-    });
+    // Keyset on (fecha_hora, id) from the previous page's cursor
+    if (page.after) {
+      filter.add(
+        `(au.fecha_hora, au.id) < (${filter.param(cursorValue(page, 0))}::timestamptz, ${filter.param(cursorValue(page, 1))}::int)`
+      );
+    }
+
+    const [result, total] = await Promise.all([
+      query(
+        `SELECT au.id, au.usuario_id, u.username, au.accion, au.entidad, au.entidad_id,
+                au.fecha_hora, au.detalle,
+                au.fecha_hora::text AS cursor_key
+         FROM AUDITORIA au
+         LEFT JOIN USUARIO u ON u.id = au.usuario_id
+         ${filter.where()}
+         ORDER BY au.fecha_hora DESC, au.id DESC
+         LIMIT ${filter.param(page.limit + 1)} OFFSET ${filter.param(page.offset)}`,
+        filter.params
+      ),
+      countTotal(page, countFromWhere, countParams),
+    ]);
+
+    res.json(
+      buildPage(result.rows, page, total, (row) => [row.cursor_key, row.id])
+    );
   } catch (error) {
     next(error);
   }
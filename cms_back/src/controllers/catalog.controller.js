@@ -1,41 +1,59 @@
 const { query } = require("../config/database");
 const { logAudit } = require("../utils/auditLogger");
+const {
+  parsePagination,
+  cursorValue,
+  countTotal,
+  buildPage,
+} = require("../utils/pagination");
+const { createFilter } = require("../utils/search");
+const {
+  catalogKey,
+  invalidateCatalog,
+  sendCached,
+} = require("../utils/catalogCache");
 
 // Generic catalog handler
 const createCatalogHandlers = (tableName, fieldName = "nombre", entityName) => {
   return {
     getAll: async (req, res, next) => {
       try {
-        const { search, limit = 10, offset = 0 } = req.query;
-
-        const result = await query(
-          `SELECT id, ${fieldName}
-           FROM ${tableName}
-           WHERE (
-             COALESCE($1::text, '') = ''
-             OR ${fieldName} ILIKE '%' || COALESCE($1::text,'') || '%'
-           )
-           ORDER BY ${fieldName} ASC
-           LIMIT $2 OFFSET $3`,
-          [search ?? null, limit, offset]
-        );
-
-        const countResult = await query(
-          `SELECT COUNT(*) AS total FROM ${tableName}
-           WHERE (
-             COALESCE($1::text, '') = ''
-             OR ${fieldName} ILIKE '%' || COALESCE($1::text,'') || '%'
-           )`,
-          [search ?? null]
-        );
-
-        res.json({
-          data: result.rows,
-          pagination: {
-            total: parseInt(countResult.rows[0].total),
-            limit: parseInt(limit),
-            offset: parseInt(offset),
-          },
+        const { search } = req.query;
+        const page = parsePagination(req.query, ["text", "int"]);
+
+        const key = catalogKey(tableName, "list", search || "", page.mode,
+          page.limit, page.offset, req.query.cursor || null, page.total);
+
+        await sendCached(req, res, key, async () => {
+          const filter = createFilter();
+          filter.search(search, [fieldName]);
+
+          const countFromWhere = `FROM ${tableName} ${filter.where()}`;
+          const countParams = [...filter.params];
+
+          // Keyset en (campo, id) ascendente a partir del cursor
+          if (page.after) {
+            filter.add(
+              `(${fieldName}, id) > (${filter.param(cursorValue(page, 0))}::text, ${filter.param(cursorValue(page, 1))}::int)`
+            );
+          }
+
+          const [result, total] = await Promise.all([
+            query(
+              `SELECT id, ${fieldName}
+               FROM ${tableName}
+               ${filter.where()}
+               ORDER BY ${fieldName} ASC, id ASC
+               LIMIT ${filter.param(page.limit + 1)} OFFSET ${filter.param(page.offset)}`,
+              filter.params
+            ),
+            countTotal(page, countFromWhere, countParams),
+          ]);
+
+          return buildPage(result.rows, page, total, (row) => [
+            row[fieldName],
+            row.id,
+          ]);
         });
       } catch (error) {
         next(error);
@@ -46,16 +64,21 @@ const createCatalogHandlers = (tableName, fieldName = "nombre", entityName) => {
       try {
         const { id } = req.params;
 
-        const result = await query(
-          `SELECT id, ${fieldName} FROM ${tableName} WHERE id = $1`,
-          [id]
-        );
+        // A missing id throws, so 404s are not cached
+        await sendCached(req, res, catalogKey(tableName, "id", id), async () => {
+          const result = await query(
+            `SELECT id, ${fieldName} FROM ${tableName} WHERE id = $1`,
+            [id]
+          );
 
-        if (result.rows.length === 0) {
-          return res.status(404).json({ error: "Record not found" });
-        }
+          if (result.rows.length === 0) {
+            const error = new Error("Record not found");
+            error.status = 404;
+            throw error;
+          }
 
-        res.json(result.rows[0]);
+          return result.rows[0];
+        });
       } catch (error) {
         next(error);
       }
@@ -75,6 +98,7 @@ const createCatalogHandlers = (tableName, fieldName = "nombre", entityName) => {
         );
 
         const newId = result.rows[0].id;
+        invalidateCatalog(tableName);
         await logAudit(req.user.id, "CREATE", entityName || tableName, newId);
 
         res.status(201).json({ id: newId, message: "Created successfully" });
@@ -101,6 +125,7 @@ const createCatalogHandlers = (tableName, fieldName = "nombre", entityName) => {
           return res.status(404).json({ error: "Record not found" });
         }
 
+        invalidateCatalog(tableName);
         await logAudit(req.user.id, "UPDATE", entityName || tableName, id);
 
         res.json({ id: result.rows[0].id, message: "Updated successfully" });
@@ -114,6 +139,7 @@ const createCatalogHandlers = (tableName, fieldName = "nombre", entityName) => {
         const { id } = req.params;
 
         await query(`DELETE FROM ${tableName} WHERE id = $1`, [id]);
+        invalidateCatalog(tableName);
 
         await logAudit(req.user.id, "DELETE", entityName || tableName, id);
 
@@ -1,17 +1,69 @@
-const { query } = require("../config/database");
+const { createCache } = require("../utils/cache");
+const {
+  loadSummaryKPIs,
+  loadLiveKPIs,
+  loadSummaryCharts,
+  loadLiveCharts,
+} = require("../utils/dashboardAggregates");
+
+const CACHE_TTL_MS = parseInt(process.env.DASHBOARD_CACHE_TTL_MS || "30000", 10);
+const dashboardCache = createCache({ name: "dashboard", ttlMs: CACHE_TTL_MS });
+
+// undefined_table / undefined_function: dashboard_aggregates.sql not applied yet
+const isMissingSummary = (error) =>
+  error.code === "42P01" || error.code === "42883";
+
+const withLiveFallback = (loadSummary, loadLive) => async () => {
+  try {
+    return { ...(await loadSummary()), source: "summary" };
+  } catch (error) {
+    if (!isMissingSummary(error)) throw error;
+    return { ...(await loadLive()), source: "live" };
+  }
+};
+
+const loaders = {
+  kpis: withLiveFallback(loadSummaryKPIs, loadLiveKPIs),
+  charts: withLiveFallback(loadSummaryCharts, loadLiveCharts),
+};
+
+const liveLoaders = {
+  kpis: async () => ({ ...(await loadLiveKPIs()), source: "live" }),
+  charts: async () => ({ ...(await loadLiveCharts()), source: "live" }),
+};
+
+// ?cache=false skips the in-process cache; ?source=live also skips the
+// summary tables and recomputes from CONSULTA/PACIENTE/MEDICO (cold read)
+const loadSection = async (req, section) => {
+  const live = req.query.source === "live";
+  const load = live ? liveLoaders[section] : loaders[section];
+
+  if (live || req.query.cache === "false") {
+    const value = await load();
+    return { value, cachedAt: Date.now(), hit: false };
+  }
+  return dashboardCache.get(section, load);
+};
+
+// How old the data is: time in the in-process cache plus, for the
+// materialized views, time since their last refresh
+const staleness = ({ value, cachedAt, hit }) => {
+  const now = Date.now();
+  const refreshedAt = value.refreshedAt ? new Date(value.refreshedAt) : null;
+  return {
+    source: value.source,
+    cache: hit ? "hit" : "miss",
+    cachedAt: new Date(cachedAt).toISOString(),
+    refreshedAt: refreshedAt ? refreshedAt.toISOString() : null,
+    staleMs: refreshedAt ? now - refreshedAt.getTime() : now - cachedAt,
+  };
+};
 
 const getKPIs = async (req, res, next) => {
   try {
-    // Obtener KPIs importantes usando consultas directas
-    const kpi1 = await query("SELECT COUNT(*) as value FROM CONSULTA");
-    const kpi2 = await query("SELECT COUNT(*) as value FROM PACIENTE");
-    const kpi3 = await query("SELECT COUNT(*) as value FROM MEDICO");
+    const kpis = await loadSection(req, "kpis");
 
-    res.json({
-      totalConsultas: parseInt(kpi1.rows[0].value) || 0,
-      totalPacientes: parseInt(kpi2.rows[0].value) || 0,
-      totalMedicos: parseInt(kpi3.rows[0].value) || 0,
-    });
+    res.json({ ...kpis.value.data, meta: staleness(kpis) });
   } catch (error) {
     next(error);
   }
@@ -19,48 +71,9 @@ const getKPIs = async (req, res, next) => {
 
 const getCharts = async (req, res, next) => {
   try {
-    // Obtener todas las gráficas usando consultas directas - Solo consultas
-    const chart1 = await query(`
-      SELECT ec.nombre as estado, count(*) as total 
-      FROM CONSULTA c 
-      JOIN ESTADO_CONSULTA ec ON c.id_estado_consulta = ec.id 
-      GROUP BY 1
-    `);
-    const chart2 = await query(`
-      SELECT 'Consultas' as entidad, COUNT(*) as total FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days'
-      UNION ALL
-      SELECT 'Pacientes' as entidad, COUNT(DISTINCT id) as total FROM PACIENTE WHERE id IN (SELECT DISTINCT id_paciente FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days')
-      UNION ALL
-      SELECT 'Médicos' as entidad, COUNT(DISTINCT id) as total FROM MEDICO WHERE id IN (SELECT DISTINCT id_medico FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days')
-    `);
-    const chart3 = await query(`
-      WITH monthly AS (
-        SELECT to_char(fecha_hora, 'YYYY-MM') as mes, count(*) as cnt
-        FROM CONSULTA
-        WHERE fecha_hora > CURRENT_DATE - INTERVAL '24 months'
-        GROUP BY 1
-      )
-      SELECT mes, sum(cnt) OVER (ORDER BY mes) as total
-      FROM monthly
-      ORDER BY mes
-    `);
-    const chart4 = await query(`
-      SELECT m.nombre as medico, count(*) as total
-      FROM CONSULTA c
-      LEFT JOIN CITA ci ON c.cita_id = ci.id
-      LEFT JOIN MEDICO m ON (ci.medico_id = m.id OR c.id_medico = m.id)
-      WHERE m.id IS NOT NULL
-      GROUP BY 1
-      ORDER BY 2 DESC
-      LIMIT 5
-    `);
+    const charts = await loadSection(req, "charts");
 
-    res.json({
-      consultasPorEstado: chart1.rows,
-      actividadPorEntidad: chart2.rows,
-      crecimientoConsultas: chart3.rows,
-      topMedicos: chart4.rows,
-    });
+    res.json({ ...charts.value.data, meta: staleness(charts) });
   } catch (error) {
     next(error);
   }
@@ -68,59 +81,15 @@ const getCharts = async (req, res, next) => {
 
 const getDashboardData = async (req, res, next) => {
   try {
-    // Obtener KPIs importantes usando consultas directas
-    const kpi1 = await query("SELECT COUNT(*) as value FROM CONSULTA");
-    const kpi2 = await query("SELECT COUNT(*) as value FROM PACIENTE");
-    const kpi3 = await query("SELECT COUNT(*) as value FROM MEDICO");
-
-    // Obtener gráficas usando consultas directas - Solo consultas
-    const chart1 = await query(`
-      SELECT ec.nombre as estado, count(*) as total 
-      FROM CONSULTA c 
-      JOIN ESTADO_CONSULTA ec ON c.id_estado_consulta = ec.id 
-      GROUP BY 1
-    `);
-    const chart2 = await query(`
-      SELECT 'Consultas' as entidad, COUNT(*) as total FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days'
-      UNION ALL
-      SELECT 'Pacientes' as entidad, COUNT(DISTINCT id) as total FROM PACIENTE WHERE id IN (SELECT DISTINCT id_paciente FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days')
-      UNION ALL
-      SELECT 'Médicos' as entidad, COUNT(DISTINCT id) as total FROM MEDICO WHERE id IN (SELECT DISTINCT id_medico FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days')
-    `);
-    const chart3 = await query(`
-      WITH monthly AS (
-        SELECT to_char(fecha_hora, 'YYYY-MM') as mes, count(*) as cnt
-        FROM CONSULTA
-        WHERE fecha_hora > CURRENT_DATE - INTERVAL '24 months'
-        GROUP BY 1
-      )
-      SELECT mes, sum(cnt) OVER (ORDER BY mes) as total
-      FROM monthly
-      ORDER BY mes
-    `);
-    const chart4 = await query(`
-      SELECT m.nombre as medico, count(*) as total
-      FROM CONSULTA c
-      LEFT JOIN CITA ci ON c.cita_id = ci.id
-      LEFT JOIN MEDICO m ON (ci.medico_id = m.id OR c.id_medico = m.id)
-      WHERE m.id IS NOT NULL
-      GROUP BY 1
-      ORDER BY 2 DESC
-      LIMIT 5
-    `);
+    const [kpis, charts] = await Promise.all([
+      loadSection(req, "kpis"),
+      loadSection(req, "charts"),
+    ]);
 
     res.json({
-      kpis: {
-        totalConsultas: parseInt(kpi1.rows[0].value) || 0,
-        totalPacientes: parseInt(kpi2.rows[0].value) || 0,
-        totalMedicos: parseInt(kpi3.rows[0].value) || 0,
-      },
-      charts: {
-        consultasPorEstado: chart1.rows,
-        actividadPorEntidad: chart2.rows,
-        crecimientoConsultas: chart3.rows,
-        topMedicos: chart4.rows,
-      },
+      kpis: kpis.value.data,
+      charts: charts.value.data,
+      meta: { kpis: staleness(kpis), charts: staleness(charts) },
     });
   } catch (error) {
     next(error);
@@ -1,10 +1,18 @@
 const { query } = require("../config/database");
 const { logAudit } = require("../utils/auditLogger");
+const { createFilter } = require("../utils/search");
 
 const getDoctors = async (req, res, next) => {
   try {
     const { search, limit = 10, offset = 0 } = req.query;
 
+    const filter = createFilter();
+    filter.searchIn(search, [
+      { key: "m.id", table: "medico", columns: ["nombre", "cedula"] },
+      { key: "u.id", table: "usuario", columns: ["username"] },
+    ]);
+    const countParams = [...filter.params];
+
     const result = await query(
       `SELECT m.id, m.nombre, u.username, COALESCE(u.correo, m.correo) as correo, COALESCE(u.telefono, m.telefono) as telefono, m.cedula, m.descripcion, m.ubicacion,
               e.nombre AS especialidad, m.id_especialidad, m.usuario_id,
@@ -14,27 +22,17 @@ const getDoctors = async (req, res, next) => {
        LEFT JOIN ESPECIALIDAD e ON e.id = m.id_especialidad
        LEFT JOIN ARCHIVO_ASOCIACION aa ON aa.entidad = 'MEDICO' AND aa.entidad_id = m.id AND aa.descripcion = 'Foto de perfil'
        LEFT JOIN ARCHIVO a ON a.id = aa.archivo_id
-       WHERE (
-         COALESCE($1::text, '') = ''
-         OR u.username ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR m.nombre ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR m.cedula ILIKE '%' || COALESCE($1::text,'') || '%'
-       )
+       ${filter.where()}
        ORDER BY m.id DESC
-       LIMIT $2 OFFSET $3`,
-      [search ?? null, limit, offset]
+       LIMIT ${filter.param(limit)} OFFSET ${filter.param(offset)}`,
+      filter.params
     );
 
     const countResult = await query(
       `SELECT COUNT(*) AS total FROM MEDICO m
        LEFT JOIN USUARIO u ON u.id = m.usuario_id
-       WHERE (
-         COALESCE($1::text, '') = ''
-         OR u.username ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR m.nombre ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR m.cedula ILIKE '%' || COALESCE($1::text,'') || '%'
-       )`,
-      [search ?? null]
+       ${filter.where()}`,
+      countParams
     );
 
     res.json({
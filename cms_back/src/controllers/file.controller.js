@@ -1,81 +1,121 @@
 const { query } = require("../config/database");
 const { logAudit } = require("../utils/auditLogger");
+const {
+  parsePagination,
+  cursorValue,
+  countTotal,
+  buildPage,
+} = require("../utils/pagination");
+const { createFilter } = require("../utils/search");
 
 // ARCHIVO
-const getFiles = async (req, res, next) => {
-  try {
-    const { search, limit = 10, offset = 0 } = req.query;
-
-    // Obtener archivos con sus asociaciones (tablas en minúsculas)
-    const result = await query(
-      `SELECT 
-         a.id, 
-         a.tipo, 
-         a.url, 
-         a.hash_integridad, 
-         a.creado_en,
-         aa.id AS asociacion_id,
-         aa.entidad,
-         aa.entidad_id,
-         aa.descripcion AS asociacion_descripcion,
-         aa.fecha_creacion AS asociacion_fecha,
-         u.username AS autor_username,
-         -- Información de la entidad asociada
-         CASE 
-           WHEN aa.entidad = 'PACIENTE' THEN p.nombre
-           WHEN aa.entidad = 'MEDICO' THEN m.nombre
-           WHEN aa.entidad = 'CONSULTA' THEN CONCAT('Consulta #', co.id::text)
-           WHEN aa.entidad = 'EPISODIO' THEN CONCAT('Episodio #', e.id::text)
-           WHEN aa.entidad = 'CITA' THEN CONCAT('Cita #', c.id::text)
-           ELSE NULL
-         END AS entidad_nombre
-       FROM archivo a
-       LEFT JOIN archivo_asociacion aa ON aa.archivo_id = a.id
-       LEFT JOIN usuario u ON u.id = aa.creado_por_usuario_id
-       LEFT JOIN paciente p ON aa.entidad = 'PACIENTE' AND p.id = aa.entidad_id
-       LEFT JOIN medico m ON aa.entidad = 'MEDICO' AND m.id = aa.entidad_id
-       LEFT JOIN consulta co ON aa.entidad = 'CONSULTA' AND co.id = aa.entidad_id
-       LEFT JOIN episodio e ON aa.entidad = 'EPISODIO' AND e.id = aa.entidad_id
-       LEFT JOIN cita c ON aa.entidad = 'CITA' AND c.id = aa.entidad_id
-       WHERE (
-         COALESCE($1::text, '') = ''
-         OR a.tipo ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR a.url ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR p.nombre ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR m.nombre ILIKE '%' || COALESCE($1::text,'') || '%'
-       )
-       ORDER BY a.creado_en DESC
-       LIMIT $2 OFFSET $3`,
-      [search ?? null, limit, offset]
-    );
-
-    const countResult = await query(
-      `SELECT COUNT(DISTINCT a.id) AS total 
-       FROM archivo a
+// Joins needed by the search filter (shared by the data and count queries)
+const FILE_SEARCH_JOINS = `
        LEFT JOIN archivo_asociacion aa ON aa.archivo_id = a.id
        LEFT JOIN paciente p ON aa.entidad = 'PACIENTE' AND p.id = aa.entidad_id
-       LEFT JOIN medico m ON aa.entidad = 'MEDICO' AND m.id = aa.entidad_id
-       WHERE (
-         COALESCE($1::text, '') = ''
-         OR a.tipo ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR a.url ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR p.nombre ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR m.nombre ILIKE '%' || COALESCE($1::text,'') || '%'
-       )`,
-      [search ?? null]
-    );
+       LEFT JOIN medico m ON aa.entidad = 'MEDICO' AND m.id = aa.entidad_id`;
 
-    console.log("Files query result:", result.rows.length, "files found");
-    console.log("Total count:", countResult.rows[0].total);
+// Files associated with the matched pacientes/medicos (idx_archivo_asoc_entidad)
+const FILE_ASSOCIATION = (entidad) => ({
+  table: "archivo_asociacion",
+  select: "archivo_id",
+  key: "entidad_id",
+  where: `entidad = '${entidad}'`,
+});
 
-    res.json({
-      data: result.rows,
-      pagination: {
-        total: parseInt(countResult.rows[0].total),
-        limit: parseInt(limit),
-        offset: parseInt(offset),
+const getFiles = async (req, res, next) => {
+  try {
+    const { search } = req.query;
+    const page = parsePagination(req.query, ["timestamp", "int", "int"]);
+
+    // Con búsqueda, los archivos candidatos salen de un UNION de búsquedas
+    // indexadas (archivo, y paciente/médico a través de archivo_asociacion)
+    // y el join parte de ese conjunto; el filtro por fila solo descarta las
+    // asociaciones que no coinciden (ver utils/search.js)
+    const filter = createFilter();
+    const candidates = filter.candidateIds(search, [
+      { table: "archivo", columns: ["tipo", "url"] },
+      {
+        table: "paciente",
+        columns: ["nombre"],
+        via: FILE_ASSOCIATION("PACIENTE"),
       },
-    });
+      {
+        table: "medico",
+        columns: ["nombre"],
+        via: FILE_ASSOCIATION("MEDICO"),
+      },
+    ]);
+    filter.search(search, ["a.tipo", "a.url", "p.nombre", "m.nombre"]);
+    const fromFiles = candidates
+      ? `(${candidates}) f JOIN archivo a ON a.id = f.id`
+      : "archivo a";
+
+    // Sin búsqueda el conteo no necesita los joins
+    const countFromWhere = search
+      ? `FROM ${fromFiles} ${FILE_SEARCH_JOINS} ${filter.where()}`
+      : "FROM archivo a";
+    const countParams = [...filter.params];
+
+    // Un archivo puede tener varias asociaciones, por eso el keyset es
+    // (creado_en, archivo id, asociación id)
+    if (page.after) {
+      filter.add(
+        `(a.creado_en, a.id, COALESCE(aa.id, 0)) < (${filter.param(cursorValue(page, 0))}::timestamptz, ${filter.param(cursorValue(page, 1))}::int, ${filter.param(cursorValue(page, 2))}::int)`
+      );
+    }
+
+    // Obtener archivos con sus asociaciones (tablas en minúsculas)
+    const [result, total] = await Promise.all([
+      query(
+        `SELECT 
+           a.id, 
+           a.tipo, 
+           a.url, 
+           a.hash_integridad, 
+           a.creado_en,
+           aa.id AS asociacion_id,
+           aa.entidad,
+           aa.entidad_id,
+           aa.descripcion AS asociacion_descripcion,
+           aa.fecha_creacion AS asociacion_fecha,
+           u.username AS autor_username,
+           -- Información de la entidad asociada
+           CASE 
+             WHEN aa.entidad = 'PACIENTE' THEN p.nombre
+             WHEN aa.entidad = 'MEDICO' THEN m.nombre
+             WHEN aa.entidad = 'CONSULTA' THEN CONCAT('Consulta #', co.id::text)
+             WHEN aa.entidad = 'EPISODIO' THEN CONCAT('Episodio #', e.id::text)
+             WHEN aa.entidad = 'CITA' THEN CONCAT('Cita #', c.id::text)
+             ELSE NULL
+           END AS entidad_nombre,
+           a.creado_en::text AS cursor_key
+         FROM ${fromFiles}
+         ${FILE_SEARCH_JOINS}
+         LEFT JOIN usuario u ON u.id = aa.creado_por_usuario_id
+         LEFT JOIN consulta co ON aa.entidad = 'CONSULTA' AND co.id = aa.entidad_id
+         LEFT JOIN episodio e ON aa.entidad = 'EPISODIO' AND e.id = aa.entidad_id
+         LEFT JOIN cita c ON aa.entidad = 'CITA' AND c.id = aa.entidad_id
+         ${filter.where()}
+         ORDER BY a.creado_en DESC, a.id DESC, COALESCE(aa.id, 0) DESC
+         LIMIT ${filter.param(page.limit + 1)} OFFSET ${filter.param(page.offset)}`,
+        filter.params
+      ),
+      countTotal(
+        page,
+        countFromWhere,
+        countParams,
+        search ? "COUNT(DISTINCT a.id)" : "COUNT(*)"
+      ),
+    ]);
+
+    res.json(
+      buildPage(result.rows, page, total, (row) => [
+        row.cursor_key,
+        row.id,
+        row.asociacion_id || 0,
+      ])
+    );
   } catch (error) {
     console.error("Error in getFiles:", error);
     next(error);
@@ -1,4 +1,13 @@
-const { query } = require("../config/database");
+const { query, pool } = require("../config/database");
+const {
+  getQueryMetrics,
+  resetQueryMetrics,
+} = require("../utils/queryMetrics");
+const { getCacheMetrics, resetCacheMetrics } = require("../utils/cache");
+const {
+  getAuditMetrics,
+  resetAuditMetrics,
+} = require("../utils/auditLogger");
 
 // Health check básico
 const getHealth = async (req, res, next) => {
@@ -143,9 +152,44 @@ const getSystemHealth = async (req, res, next) => {
   }
 };
 
+// Métricas de consultas por ruta, del pool de conexiones, de la cola de auditoría y de los caches
+const getMetrics = async (req, res, next) => {
+  try {
+    res.json({
+      timestamp: new Date().toISOString(),
+      uptime: process.uptime(),
+      pool: {
+        total: pool.totalCount,
+        idle: pool.idleCount,
+        waiting: pool.waitingCount,
+        max: pool.options.max,
+      },
+      ...getQueryMetrics(),
+      ...getAuditMetrics(),
+      ...getCacheMetrics(),
+    });
+  } catch (error) {
+    next(error);
+  }
+};
+
+// Reinicia los agregados (el harness de carga lo llama al iniciar cada prueba)
+const resetMetrics = async (req, res, next) => {
+  try {
+    resetQueryMetrics();
+    resetAuditMetrics();
+    resetCacheMetrics();
+    res.json({ message: "Metrics reset successfully" });
+  } catch (error) {
+    next(error);
+  }
+};
+
 module.exports = {
   getHealth,
   getDatabaseHealth,
   getApiHealth,
   getSystemHealth,
+  getMetrics,
+  resetMetrics,
 };
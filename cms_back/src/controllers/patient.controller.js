@@ -1,10 +1,26 @@
 const { query } = require("../config/database");
 const { logAudit } = require("../utils/auditLogger");
+const { createFilter } = require("../utils/search");
 
 const getPatients = async (req, res, next) => {
   try {
     const { search, limit = 10, offset = 0 } = req.query;
 
+    // correo mostrado = COALESCE(u.correo, p.correo); u.correo es NOT NULL,
+    // así que p.correo solo cuenta para pacientes sin usuario
+    const filter = createFilter();
+    filter.searchIn(search, [
+      { key: "p.id", table: "paciente", columns: ["nombre"] },
+      {
+        key: "p.id",
+        table: "paciente",
+        columns: ["correo"],
+        where: "usuario_id IS NULL",
+      },
+      { key: "u.id", table: "usuario", columns: ["username", "correo"] },
+    ]);
+    const countParams = [...filter.params];
+
     const result = await query(
       `SELECT p.id, p.nombre, u.username, COALESCE(u.correo, p.correo) as correo, COALESCE(u.telefono, p.telefono) as telefono, p.fecha_nacimiento, p.sexo,
               p.altura, p.peso, p.estilo_vida, p.alergias,
@@ -21,27 +37,17 @@ const getPatients = async (req, res, next) => {
        LEFT JOIN MEDICO mg ON mg.id = p.id_medico_gen
        LEFT JOIN ARCHIVO_ASOCIACION aa ON aa.entidad = 'PACIENTE' AND aa.entidad_id = p.id AND aa.descripcion = 'Foto de perfil'
        LEFT JOIN ARCHIVO a ON a.id = aa.archivo_id
-       WHERE (
-         COALESCE($1::text, '') = ''
-         OR u.username ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR p.nombre ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR COALESCE(u.correo, p.correo) ILIKE '%' || COALESCE($1::text,'') || '%'
-       )
+       ${filter.where()}
        ORDER BY p.id DESC
-       LIMIT $2 OFFSET $3`,
-      [search ?? null, limit, offset]
+       LIMIT ${filter.param(limit)} OFFSET ${filter.param(offset)}`,
+      filter.params
     );
 
     const countResult = await query(
       `SELECT COUNT(*) AS total FROM PACIENTE p
        LEFT JOIN USUARIO u ON u.id = p.usuario_id
-       WHERE (
-         COALESCE($1::text, '') = ''
-         OR u.username ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR p.nombre ILIKE '%' || COALESCE($1::text,'') || '%'
-         OR COALESCE(u.correo, p.correo) ILIKE '%' || COALESCE($1::text,'') || '%'
-       )`,
-      [search ?? null]
+       ${filter.where()}`,
+      countParams
     );
 
     res.json({
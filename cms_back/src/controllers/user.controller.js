@@ -1,31 +1,30 @@
 const bcrypt = require("bcryptjs");
 const { query } = require("../config/database");
 const { logAudit } = require("../utils/auditLogger");
+const { createFilter } = require("../utils/search");
 
 const getUsers = async (req, res, next) => {
   try {
     const { search, limit = 10, offset = 0 } = req.query;
 
+    const filter = createFilter();
+    filter.search(search, ["u.username", "u.correo"]);
+    const countParams = [...filter.params];
+
     const result = await query(
       `SELECT u.id, u.username, u.correo, u.telefono, u.rol_id, r.nombre as rol_nombre
        FROM usuario u
        LEFT JOIN rol r ON u.rol_id = r.id
-       WHERE ($1::text IS NULL OR u.username ILIKE '%' || $1 || '%' OR u.correo ILIKE '%' || $1 || '%')
+       ${filter.where()}
        ORDER BY u.id DESC
-       LIMIT $2 OFFSET $3`,
-      [search || null, limit, offset]
+       LIMIT ${filter.param(limit)} OFFSET ${filter.param(offset)}`,
+      filter.params
     );
 
     // Get total count
     const countResult = await query(
-      `SELECT COUNT(*) AS total
-           FROM usuario
-          WHERE (
-            $1::text IS NULL
-            OR username ILIKE '%' || $1 || '%'
-            OR correo   ILIKE '%' || $1 || '%'
-          )`,
-      [search || null]
+      `SELECT COUNT(*) AS total FROM usuario u ${filter.where()}`,
+      countParams
     );
 
     res.json({
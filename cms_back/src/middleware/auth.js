@@ -1,3 +1,4 @@
+const crypto = require("crypto");
 const jwt = require("jsonwebtoken");
 
 const authenticateToken = (req, res, next) => {
@@ -32,7 +33,29 @@ const checkRole = (roles) => {
   };
 };
 
+// Admin role names used by the seed scripts (init-postgres.sql / seed-data.sql)
+const ADMIN_ROLES = ["admin", "Administrador"];
+
+const tokenMatches = (given, expected) => {
+  const a = Buffer.from(String(given));
+  const b = Buffer.from(expected);
+  return a.length === b.length && crypto.timingSafeEqual(a, b);
+};
+
+// /health/metrics: X-Metrics-Token equal to METRICS_TOKEN (load harness,
+// scrapers) or an admin JWT
+const authenticateMetrics = (req, res, next) => {
+  const metricsToken = process.env.METRICS_TOKEN;
+  const given = req.headers["x-metrics-token"];
+  if (metricsToken && given && tokenMatches(given, metricsToken)) {
+    return next();
+  }
+
+  authenticateToken(req, res, () => checkRole(ADMIN_ROLES)(req, res, next));
+};
+
 module.exports = {
   authenticateToken,
   checkRole,
+  authenticateMetrics,
 };
@@ -0,0 +1,9 @@
+const { requestContext } = require("../utils/queryMetrics");
+
+// Runs the rest of the request inside an async context so query() can
+// attribute each statement to the route that issued it
+const trackQueryContext = (req, res, next) => {
+  requestContext.run(req, next);
+};
+
+module.exports = trackQueryContext;
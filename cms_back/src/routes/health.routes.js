@@ -1,6 +1,7 @@
 const express = require("express");
 const router = express.Router();
 const healthController = require("../controllers/health.controller");
+const { authenticateMetrics } = require("../middleware/auth");
 
 // Health check endpoints (sin autenticación para monitoreo)
 router.get("/", healthController.getHealth);
@@ -8,4 +9,8 @@ router.get("/database", healthController.getDatabaseHealth);
 router.get("/api", healthController.getApiHealth);
 router.get("/system", healthController.getSystemHealth);
 
+// Métricas internas (formas SQL, pool, caches): METRICS_TOKEN o JWT de admin
+router.get("/metrics", authenticateMetrics, healthController.getMetrics);
+router.delete("/metrics", authenticateMetrics, healthController.resetMetrics);
+
 module.exports = router;
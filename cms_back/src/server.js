@@ -5,6 +5,10 @@ const morgan = require("morgan");
 require("dotenv").config();
 
 const errorHandler = require("./middleware/errorHandler");
+const trackQueryContext = require("./middleware/queryContext");
+const { scheduleAggregateRefresh } = require("./utils/dashboardAggregates");
+const { flushAudit } = require("./utils/auditLogger");
+const { pool } = require("./config/database");
 
 // Import routes
 const healthRoutes = require("./routes/health.routes");
@@ -34,6 +38,7 @@ app.use(
 app.use(morgan("dev")); // Logging
 app.use(express.json());
 app.use(express.urlencoded({ extended: true }));
+app.use(trackQueryContext); // Attribute SQL metrics to the route that ran them
 
 // Health check routes (sin autenticación para monitoreo)
 app.use("/health", healthRoutes);
@@ -60,10 +65,44 @@ app.use((req, res) => {
 app.use(errorHandler);
 
 // Start server
-app.listen(PORT, () => {
+const server = app.listen(PORT, () => {
   console.log(`🚀 Server running on port ${PORT}`);
   console.log(`📊 Environment: ${process.env.NODE_ENV || "development"}`);
   console.log(`🔗 API: http://localhost:${PORT}`);
+  scheduleAggregateRefresh();
 });
 
+// Graceful shutdown: stop accepting requests, write the queued audit entries
+// and close the pool before exiting (forced after SHUTDOWN_TIMEOUT_MS)
+const SHUTDOWN_TIMEOUT_MS = parseInt(
+  process.env.SHUTDOWN_TIMEOUT_MS || "10000",
+  10
+);
+
+let exiting = false;
+
+const exit = async () => {
+  // Runs once, whether server.close or the timeout gets here first
+  if (exiting) return;
+  exiting = true;
+  try {
+    await flushAudit();
+    await pool.end();
+  } catch (error) {
+    console.error("Error during shutdown:", error.message);
+  }
+  process.exit(0);
+};
+
+const shutdown = (signal) => {
+  console.log(`🛑 ${signal} received, shutting down...`);
+  setTimeout(exit, SHUTDOWN_TIMEOUT_MS).unref();
+  server.close(exit);
+  // Idle keep-alive sockets would otherwise hold close() until the timeout
+  server.closeIdleConnections();
+};
+
+process.on("SIGTERM", () => shutdown("SIGTERM"));
+process.on("SIGINT", () => shutdown("SIGINT"));
+
 module.exports = app;
@@ -1,17 +1,165 @@
 const { query } = require("../config/database");
+const { requestContext } = require("./queryMetrics");
 
-const logAudit = async (userId, action, entity, entityId, detail = null) => {
-  try {
-    // Usar query directa
-    await query(
-      `INSERT INTO auditoria (usuario_id, accion, entidad, entidad_id, detalle) 
-       VALUES ($1, $2, $3, $4, $5)`,
-      [userId, action, entity, entityId, detail]
+// Audit entries are queued in memory and written as multi-row INSERTs when
+// a batch fills or AUDIT_FLUSH_INTERVAL_MS passes, so write requests don't
+// pay an extra round trip. AUDIT_ASYNC=false restores one INSERT per call.
+const ASYNC_ENABLED = process.env.AUDIT_ASYNC !== "false";
+const BATCH_SIZE = parseInt(process.env.AUDIT_BATCH_SIZE || "100", 10);
+const FLUSH_INTERVAL_MS = parseInt(
+  process.env.AUDIT_FLUSH_INTERVAL_MS || "200",
+  10
+);
+const QUEUE_MAX = parseInt(process.env.AUDIT_QUEUE_MAX || "10000", 10);
+
+const COLUMNS = [
+  "usuario_id",
+  "accion",
+  "entidad",
+  "entidad_id",
+  "detalle",
+  "fecha_hora",
+];
+
+const queue = [];
+let flushTimer = null;
+let flushing = null; // Promise of the running flush, flushes never overlap
+
+const emptyCounters = () => ({
+  queued: 0,
+  flushed: 0,
+  dropped: 0,
+  failed: 0,
+  batches: 0,
+  backpressureWaits: 0,
+});
+let counters = emptyCounters();
+let since = new Date();
+
+// fecha_hora is a TIMESTAMP without time zone filled by NOW() elsewhere: the
+// ISO instant goes in as timestamptz so Postgres converts it to the session
+// time zone, whatever time zone the backend runs in
+const CASTS = { fecha_hora: "::timestamptz" };
+
+const insertEntries = async (entries) => {
+  const params = [];
+  const rows = entries.map((entry) => {
+    const offset = params.length;
+    params.push(
+      entry.userId,
+      entry.action,
+      entry.entity,
+      entry.entityId,
+      entry.detail,
+      entry.at.toISOString()
     );
-  } catch (error) {
-    console.error("Error logging audit:", error);
-    // Don't throw - audit logging shouldn't break the main operation
+    return `(${COLUMNS.map(
+      (column, i) => `$${offset + i + 1}${CASTS[column] || ""}`
+    ).join(", ")})`;
+  });
+
+  await query(
+    `INSERT INTO auditoria (${COLUMNS.join(", ")})
+     VALUES ${rows.join(", ")}`,
+    params
+  );
+};
+
+// Drains the queue one batch at a time. Runs outside the request context so
+// the INSERTs show up as "background" in the query metrics.
+const flush = () => {
+  if (!flushing) {
+    flushing = requestContext.exit(async () => {
+      // Yield first: with an empty queue the body would otherwise finish
+      // (and clear `flushing`) before the promise is assigned above
+      await null;
+      try {
+        while (queue.length > 0) {
+          const batch = queue.splice(0, BATCH_SIZE);
+          try {
+            await insertEntries(batch);
+            counters.flushed += batch.length;
+            counters.batches += 1;
+          } catch (error) {
+            counters.failed += batch.length;
+            console.error("Error flushing audit batch:", error.message);
+          }
+        }
+      } finally {
+        flushing = null;
+      }
+    });
   }
+  return flushing;
+};
+
+const scheduleFlush = () => {
+  if (flushTimer) return;
+  flushTimer = setTimeout(() => {
+    flushTimer = null;
+    flush();
+  }, FLUSH_INTERVAL_MS);
+};
+
+const logAudit = async (userId, action, entity, entityId, detail = null) => {
+  // fecha_hora is taken now, not when the batch is written
+  const entry = { userId, action, entity, entityId, detail, at: new Date() };
+
+  if (!ASYNC_ENABLED) {
+    try {
+      await insertEntries([entry]);
+    } catch (error) {
+      console.error("Error logging audit:", error);
+      // Don't throw - audit logging shouldn't break the main operation
+    }
+    return;
+  }
+
+  // Backpressure: a full queue makes the caller wait for the running flush;
+  // if it is still full afterwards the entry is dropped (and counted)
+  if (queue.length >= QUEUE_MAX) {
+    counters.backpressureWaits += 1;
+    await flush();
+    if (queue.length >= QUEUE_MAX) {
+      counters.dropped += 1;
+      return;
+    }
+  }
+
+  queue.push(entry);
+  counters.queued += 1;
+
+  if (queue.length >= BATCH_SIZE) {
+    flush();
+  } else {
+    scheduleFlush();
+  }
+};
+
+// Writes everything still queued (graceful shutdown)
+const flushAudit = async () => {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  await flush();
+};
+
+const getAuditMetrics = () => ({
+  audit: {
+    mode: ASYNC_ENABLED ? "batched" : "sync",
+    since: since.toISOString(),
+    batchSize: BATCH_SIZE,
+    flushIntervalMs: FLUSH_INTERVAL_MS,
+    queueMax: QUEUE_MAX,
+    pending: queue.length,
+    ...counters,
+  },
+});
+
+const resetAuditMetrics = () => {
+  counters = emptyCounters();
+  since = new Date();
 };
 
-module.exports = { logAudit };
+module.exports = { logAudit, flushAudit, getAuditMetrics, resetAuditMetrics };
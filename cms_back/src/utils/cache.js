@@ -0,0 +1,110 @@
+// In-process TTL cache with stampede protection: concurrent misses for the
+// same key share a single in-flight load instead of all hitting the database.
+// With maxEntries it is also an LRU: a hit moves the key to the end and the
+// least recently used key is evicted when the cache is full.
+
+// Named caches, so /health/metrics can report all of them
+const registry = new Map();
+
+const emptyStats = () => ({ hits: 0, misses: 0, evictions: 0 });
+
+const createCache = ({ ttlMs, maxEntries = Infinity, name }) => {
+  const entries = new Map(); // key -> { value, cachedAt }, oldest use first
+  const inflight = new Map(); // key -> Promise
+  let stats = emptyStats();
+  // Bumped by invalidate() so a load that started before a write is not stored
+  let generation = 0;
+
+  const store = (key, entry) => {
+    entries.delete(key);
+    entries.set(key, entry);
+    while (entries.size > maxEntries) {
+      entries.delete(entries.keys().next().value);
+      stats.evictions += 1;
+    }
+  };
+
+  const get = async (key, loader) => {
+    const entry = entries.get(key);
+    if (entry && Date.now() - entry.cachedAt < ttlMs) {
+      stats.hits += 1;
+      store(key, entry);
+      return { ...entry, hit: true };
+    }
+    if (entry) {
+      entries.delete(key);
+    }
+    stats.misses += 1;
+
+    let pending = inflight.get(key);
+    if (!pending) {
+      const startedAt = generation;
+      pending = (async () => {
+        const fresh = { value: await loader(), cachedAt: Date.now() };
+        if (startedAt === generation) {
+          store(key, fresh);
+        }
+        return fresh;
+      })();
+      inflight.set(key, pending);
+      const settled = () => {
+        if (inflight.get(key) === pending) inflight.delete(key);
+      };
+      pending.then(settled, settled);
+    }
+
+    return { ...(await pending), hit: false };
+  };
+
+  // No argument clears everything; a function removes the keys it matches
+  const invalidate = (key) => {
+    generation += 1;
+    const matches =
+      key === undefined
+        ? () => true
+        : typeof key === "function"
+        ? key
+        : (cached) => cached === key;
+    for (const map of [entries, inflight]) {
+      for (const cached of [...map.keys()]) {
+        if (matches(cached)) map.delete(cached);
+      }
+    }
+  };
+
+  // Extra counters kept next to hits/misses (e.g. responses answered with 304)
+  const record = (counter, amount = 1) => {
+    stats[counter] = (stats[counter] || 0) + amount;
+  };
+
+  const getStats = () => ({
+    ...stats,
+    size: entries.size,
+    maxEntries: Number.isFinite(maxEntries) ? maxEntries : null,
+    ttlMs,
+  });
+
+  const resetStats = () => {
+    stats = emptyStats();
+  };
+
+  const cache = { get, invalidate, record, getStats, resetStats };
+  if (name) {
+    registry.set(name, cache);
+  }
+  return cache;
+};
+
+const getCacheMetrics = () => ({
+  caches: Object.fromEntries(
+    [...registry].map(([name, cache]) => [name, cache.getStats()])
+  ),
+});
+
+const resetCacheMetrics = () => {
+  for (const cache of registry.values()) {
+    cache.resetStats();
+  }
+};
+
+module.exports = { createCache, getCacheMetrics, resetCacheMetrics };
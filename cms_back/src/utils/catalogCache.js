@@ -0,0 +1,67 @@
+const crypto = require("crypto");
+const { query } = require("../config/database");
+const { createCache } = require("./cache");
+
+// Catalogs (ESTADO_CITA, TIPO_CITA, ESPECIALIDAD, ...) almost never change:
+// responses are cached already serialized, with a strong ETag, and every
+// entry of a table is dropped when the table is written through the API.
+const CATALOG_CACHE_TTL_MS = parseInt(
+  process.env.CATALOG_CACHE_TTL_MS || "300000",
+  10
+);
+const CATALOG_CACHE_MAX_ENTRIES = parseInt(
+  process.env.CATALOG_CACHE_MAX_ENTRIES || "500",
+  10
+);
+
+const catalogCache = createCache({
+  name: "catalog",
+  ttlMs: CATALOG_CACHE_TTL_MS,
+  maxEntries: CATALOG_CACHE_MAX_ENTRIES,
+});
+
+// Keys are JSON arrays that start with the table name
+const catalogKey = (table, ...parts) => JSON.stringify([table, ...parts]);
+
+const invalidateCatalog = (table) => {
+  const prefix = JSON.stringify([table]).slice(0, -1) + ",";
+  catalogCache.invalidate((key) => key.startsWith(prefix));
+};
+
+const serialize = (body) => {
+  const json = JSON.stringify(body);
+  const digest = crypto.createHash("sha1").update(json).digest("base64url");
+  return { json, etag: `"${digest}"`, bytes: Buffer.byteLength(json) };
+};
+
+// Sends a cached JSON body; answers 304 when If-None-Match still matches.
+// ?cache=false skips the cache (cold read reference for benchmarks).
+const sendCached = async (req, res, key, loader) => {
+  const entry =
+    req.query.cache === "false"
+      ? { value: serialize(await loader()), hit: false }
+      : await catalogCache.get(key, async () => serialize(await loader()));
+  const { json, etag, bytes } = entry.value;
+
+  res.set("ETag", etag);
+  res.set("Cache-Control", "private, no-cache");
+  res.set("X-Cache", entry.hit ? "HIT" : "MISS");
+
+  if (req.fresh) {
+    catalogCache.record("notModified");
+    catalogCache.record("bytesSaved", bytes);
+    return res.status(304).end();
+  }
+  res.type("json").send(json);
+};
+
+// id -> name map of a catalog, for list queries that would otherwise join it
+const catalogNames = async (table, field = "nombre") => {
+  const entry = await catalogCache.get(catalogKey(table, "names"), async () => {
+    const result = await query(`SELECT id, ${field} FROM ${table}`);
+    return new Map(result.rows.map((row) => [row.id, row[field]]));
+  });
+  return entry.value;
+};
+
+module.exports = { catalogKey, invalidateCatalog, sendCached, catalogNames };
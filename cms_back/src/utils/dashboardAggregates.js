@@ -0,0 +1,141 @@
+const { query } = require("../config/database");
+
+// Summary objects live in cms_db/dashboard_aggregates.sql. "live" reads
+// compute the same numbers from the base tables (cold-read reference).
+
+const REFRESH_INTERVAL_MS = parseInt(
+  process.env.DASHBOARD_REFRESH_INTERVAL_MS || "300000",
+  10
+);
+
+const toKPIs = (consultas, pacientes, medicos) => ({
+  totalConsultas: parseInt(consultas) || 0,
+  totalPacientes: parseInt(pacientes) || 0,
+  totalMedicos: parseInt(medicos) || 0,
+});
+
+// KPIs: base counters plus the deltas written by triggers, never stale
+const loadSummaryKPIs = async () => {
+  const result = await query("SELECT entidad, total FROM v_dashboard_contador");
+  const totals = Object.fromEntries(
+    result.rows.map((row) => [row.entidad, row.total])
+  );
+  return {
+    data: toKPIs(totals.consulta, totals.paciente, totals.medico),
+    refreshedAt: new Date(),
+  };
+};
+
+const loadLiveKPIs = async () => {
+  const [kpi1, kpi2, kpi3] = await Promise.all([
+    query("SELECT COUNT(*) as value FROM CONSULTA"),
+    query("SELECT COUNT(*) as value FROM PACIENTE"),
+    query("SELECT COUNT(*) as value FROM MEDICO"),
+  ]);
+  return {
+    data: toKPIs(kpi1.rows[0].value, kpi2.rows[0].value, kpi3.rows[0].value),
+    refreshedAt: new Date(),
+  };
+};
+
+// Charts: materialized views refreshed on a schedule
+const loadSummaryCharts = async () => {
+  const [chart1, chart2, chart3, chart4, refresh] = await Promise.all([
+    query("SELECT estado, total FROM mv_dashboard_consultas_estado"),
+    query("SELECT entidad, total FROM mv_dashboard_actividad"),
+    query(`
+      SELECT mes, sum(cnt) OVER (ORDER BY mes) as total
+      FROM mv_dashboard_consultas_mes
+      ORDER BY mes
+    `),
+    query(`
+      SELECT medico, total
+      FROM mv_dashboard_top_medicos
+      ORDER BY total DESC
+      LIMIT 5
+    `),
+    query("SELECT refrescado_en FROM DASHBOARD_REFRESCO WHERE id = 1"),
+  ]);
+  return {
+    data: {
+      consultasPorEstado: chart1.rows,
+      actividadPorEntidad: chart2.rows,
+      crecimientoConsultas: chart3.rows,
+      topMedicos: chart4.rows,
+    },
+    refreshedAt: refresh.rows[0] ? refresh.rows[0].refrescado_en : null,
+  };
+};
+
+const loadLiveCharts = async () => {
+  const [chart1, chart2, chart3, chart4] = await Promise.all([
+    query(`
+      SELECT ec.nombre as estado, count(*) as total
+      FROM CONSULTA c
+      JOIN ESTADO_CONSULTA ec ON c.id_estado_consulta = ec.id
+      GROUP BY 1
+    `),
+    query(`
+      SELECT 'Consultas' as entidad, COUNT(*) as total FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days'
+      UNION ALL
+      SELECT 'Pacientes' as entidad, COUNT(DISTINCT id) as total FROM PACIENTE WHERE id IN (SELECT DISTINCT id_paciente FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days')
+      UNION ALL
+      SELECT 'Médicos' as entidad, COUNT(DISTINCT id) as total FROM MEDICO WHERE id IN (SELECT DISTINCT id_medico FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days')
+    `),
+    query(`
+      WITH monthly AS (
+        SELECT to_char(fecha_hora, 'YYYY-MM') as mes, count(*) as cnt
+        FROM CONSULTA
+        WHERE fecha_hora > CURRENT_DATE - INTERVAL '24 months'
+        GROUP BY 1
+      )
+      SELECT mes, sum(cnt) OVER (ORDER BY mes) as total
+      FROM monthly
+      ORDER BY mes
+    `),
+    query(`
+      SELECT m.nombre as medico, count(*) as total
+      FROM CONSULTA c
+      LEFT JOIN CITA ci ON c.cita_id = ci.id
+      LEFT JOIN MEDICO m ON (ci.medico_id = m.id OR c.id_medico = m.id)
+      WHERE m.id IS NOT NULL
+      GROUP BY 1
+      ORDER BY 2 DESC
+      LIMIT 5
+    `),
+  ]);
+  return {
+    data: {
+      consultasPorEstado: chart1.rows,
+      actividadPorEntidad: chart2.rows,
+      crecimientoConsultas: chart3.rows,
+      topMedicos: chart4.rows,
+    },
+    refreshedAt: new Date(),
+  };
+};
+
+let refreshTimer = null;
+
+const refreshAggregates = async () => {
+  try {
+    await query("SELECT refresh_dashboard_aggregates()");
+  } catch (error) {
+    console.error("Error refreshing dashboard aggregates:", error.message);
+  }
+};
+
+const scheduleAggregateRefresh = () => {
+  if (refreshTimer || REFRESH_INTERVAL_MS <= 0) return;
+  refreshTimer = setInterval(refreshAggregates, REFRESH_INTERVAL_MS);
+  refreshTimer.unref();
+};
+
+module.exports = {
+  loadSummaryKPIs,
+  loadLiveKPIs,
+  loadSummaryCharts,
+  loadLiveCharts,
+  refreshAggregates,
+  scheduleAggregateRefresh,
+};
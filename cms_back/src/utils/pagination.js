@@ -0,0 +1,140 @@
+const { query } = require("../config/database");
+
+// List endpoints support two pagination modes:
+//   offset (default): ?limit=10&offset=20
+//   cursor (keyset):  ?pagination=cursor&limit=10, then ?cursor=<nextCursor>
+// and three ways of reporting the total:
+//   ?total=exact    COUNT(*) with the same filters (default in offset mode)
+//   ?total=estimate planner row estimate, no table scan
+//   ?total=none     no total (default in cursor mode)
+
+const TOTAL_MODES = ["none", "exact", "estimate"];
+
+const encodeCursor = (values) =>
+  Buffer.from(JSON.stringify(values)).toString("base64url");
+
+// Timestamps come from "<column>::text" (e.g. 2024-05-01 09:30:00.123456-06)
+const TIMESTAMP_PATTERN =
+  /^(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})(\.\d{1,6})?(Z|[+-]\d{2}(:?\d{2}){0,2})?$/;
+
+const isTimestamp = (value) => {
+  const match = typeof value === "string" && TIMESTAMP_PATTERN.exec(value);
+  if (!match) return false;
+  const [year, month, day, hour, minute, second] = match.slice(1, 7).map(Number);
+  // Round trip through Date rejects 2024-02-31, 25:00:00 and similar
+  const date = new Date(Date.UTC(year, month - 1, day, hour, minute, second));
+  return (
+    date.getUTCFullYear() === year &&
+    date.getUTCMonth() === month - 1 &&
+    date.getUTCDate() === day &&
+    date.getUTCHours() === hour &&
+    date.getUTCMinutes() === minute &&
+    date.getUTCSeconds() === second
+  );
+};
+
+// Types of the keyset columns, checked before the cursor reaches SQL casts
+const KEY_TYPES = {
+  timestamp: isTimestamp,
+  int: (value) =>
+    Number.isInteger(value) && value >= -2147483648 && value <= 2147483647,
+  text: (value) => typeof value === "string",
+};
+
+// keyset: types of the endpoint's sort key, e.g. ["timestamp", "int"]
+const decodeCursor = (cursor, keyset) => {
+  try {
+    const values = JSON.parse(Buffer.from(cursor, "base64url").toString());
+    const valid =
+      Array.isArray(values) &&
+      values.length === keyset.length &&
+      keyset.every((type, i) => KEY_TYPES[type](values[i]));
+    return valid ? values : null;
+  } catch (error) {
+    return null;
+  }
+};
+
+const parsePagination = (reqQuery, keyset) => {
+  const { limit = 10, offset = 0, cursor, pagination, total } = reqQuery;
+  const mode = cursor || pagination === "cursor" ? "cursor" : "offset";
+
+  const after = cursor ? decodeCursor(String(cursor), keyset) : null;
+  if (cursor && !after) {
+    const error = new Error("Invalid cursor");
+    error.status = 400;
+    throw error;
+  }
+
+  return {
+    mode,
+    limit: parseInt(limit),
+    offset: mode === "cursor" ? 0 : parseInt(offset),
+    after,
+    total: TOTAL_MODES.includes(total)
+      ? total
+      : mode === "cursor"
+      ? "none"
+      : "exact",
+  };
+};
+
+// Positional value of the cursor for the keyset predicate, or null on the first page
+const cursorValue = (page, position) =>
+  page.after ? page.after[position] ?? null : null;
+
+// fromWhere is the "FROM ... WHERE ..." part shared with the data query
+const countTotal = async (page, fromWhere, params, countExpr = "COUNT(*)") => {
+  if (page.total === "exact") {
+    const result = await query(
+      `SELECT ${countExpr} AS total ${fromWhere}`,
+      params
+    );
+    return parseInt(result.rows[0].total);
+  }
+
+  if (page.total === "estimate") {
+    const result = await query(
+      `EXPLAIN (FORMAT JSON) SELECT 1 ${fromWhere}`,
+      params
+    );
+    return Math.round(result.rows[0]["QUERY PLAN"][0].Plan["Plan Rows"]);
+  }
+
+  return null;
+};
+
+// Rows are fetched with LIMIT page.limit + 1 so hasMore needs no count.
+// keyOf(row) returns the sort key of a row; a cursor_key column (the
+// timestamp as text, so no microseconds are lost) is dropped from the output.
+const buildPage = (rows, page, total, keyOf) => {
+  const hasMore = rows.length > page.limit;
+  const data = hasMore ? rows.slice(0, page.limit) : rows;
+  const last = data[data.length - 1];
+  const nextCursor = hasMore && last ? encodeCursor(keyOf(last)) : null;
+
+  for (const row of data) {
+    delete row.cursor_key;
+  }
+
+  const pagination = {
+    mode: page.mode,
+    total,
+    totalEstimated: page.total === "estimate",
+    limit: page.limit,
+    hasMore,
+    nextCursor,
+  };
+  if (page.mode === "offset") {
+    pagination.offset = page.offset;
+  }
+
+  return { data, pagination };
+};
+
+module.exports = {
+  parsePagination,
+  cursorValue,
+  countTotal,
+  buildPage,
+};
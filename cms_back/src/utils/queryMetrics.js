@@ -0,0 +1,89 @@
+const { AsyncLocalStorage } = require("async_hooks");
+
+// Request that triggered the current query (set by middleware/queryContext)
+const requestContext = new AsyncLocalStorage();
+
+// Limits so dynamic SQL can't grow the maps without bound
+const MAX_FINGERPRINTS = 1000;
+const MAX_SHAPES = 500;
+
+const fingerprints = new Map();
+let stats = new Map();
+let since = new Date();
+
+// Normalize a statement into its "shape": no literals, no comments,
+// collapsed whitespace and multi-row VALUES lists folded into one tuple
+const fingerprint = (text) => {
+  let fp = fingerprints.get(text);
+  if (fp !== undefined) return fp;
+
+  fp = text
+    .replace(/--[^\n]*/g, "")
+    .replace(/'(?:[^']|'')*'/g, "?")
+    .replace(/\$\d+/g, "?")
+    .replace(/(?<![\w.])\d+(?:\.\d+)?\b/g, "?")
+    .replace(/\s+/g, " ")
+    .replace(/(\([^()]*\))(?:\s*,\s*\([^()]*\))+/g, "$1, ...")
+    .trim();
+
+  if (fingerprints.size < MAX_FINGERPRINTS) {
+    fingerprints.set(text, fp);
+  }
+  return fp;
+};
+
+const currentRoute = () => {
+  const req = requestContext.getStore();
+  if (!req) return "background";
+  return `${req.method} ${req.baseUrl}${req.route ? req.route.path : ""}`;
+};
+
+// O(1) per query: one map lookup and a few additions, no I/O
+const recordQuery = (text, durationMs, rowCount, failed = false) => {
+  const route = currentRoute();
+  let sql = fingerprint(text);
+  let key = `${route}\u0000${sql}`;
+
+  if (!stats.has(key) && stats.size >= MAX_SHAPES) {
+    sql = "(other)";
+    key = `${route}\u0000${sql}`;
+  }
+
+  let entry = stats.get(key);
+  if (!entry) {
+    entry = { route, sql, count: 0, errors: 0, totalMs: 0, maxMs: 0, rows: 0 };
+    stats.set(key, entry);
+  }
+
+  entry.count++;
+  entry.totalMs += durationMs;
+  entry.rows += rowCount || 0;
+  if (durationMs > entry.maxMs) entry.maxMs = durationMs;
+  if (failed) entry.errors++;
+};
+
+const getQueryMetrics = () => {
+  const queries = Array.from(stats.values())
+    .map((entry) => ({
+      ...entry,
+      totalMs: Math.round(entry.totalMs * 100) / 100,
+      maxMs: Math.round(entry.maxMs * 100) / 100,
+      avgMs: Math.round((entry.totalMs / entry.count) * 100) / 100,
+    }))
+    .sort((a, b) => b.totalMs - a.totalMs);
+
+  return { since: since.toISOString(), shapes: queries.length, queries };
+};
+
+const resetQueryMetrics = () => {
+  stats = new Map();
+  since = new Date();
+};
+
+module.exports = {
+  requestContext,
+  fingerprint,
+  recordQuery,
+  getQueryMetrics,
+  resetQueryMetrics,
+};
@@ -0,0 +1,87 @@
+// Builds the WHERE clause of list queries from the filters actually sent.
+// An empty filter adds no condition at all (instead of the old
+// "COALESCE($1,'') = '' OR col ILIKE ..." catch-all), and ?search becomes a
+// plain "col ILIKE $n" that the pg_trgm indexes in
+// cms_db/search_indexes.sql can serve.
+
+// % and _ in the user's text are matched literally
+const escapeLike = (term) => term.replace(/[\\%_]/g, "\\$&");
+
+const searchPattern = (term) => {
+  const text = typeof term === "string" ? term.trim() : "";
+  return text ? `%${escapeLike(text)}%` : null;
+};
+
+const createFilter = () => {
+  const conditions = [];
+  const params = [];
+
+  // Adds a value and returns its placeholder
+  const param = (value) => {
+    params.push(value);
+    return `$${params.length}`;
+  };
+
+  const add = (condition) => {
+    conditions.push(condition);
+  };
+
+  // Columns of the same table (or already joined rows):
+  //   (col1 ILIKE $n OR col2 ILIKE $n)
+  const search = (term, columns) => {
+    const pattern = searchPattern(term);
+    if (!pattern) return;
+    const placeholder = param(pattern);
+    add(`(${columns.map((column) => `${column} ILIKE ${placeholder}`).join(" OR ")})`);
+  };
+
+  // Columns spread over several joined tables. Each table is searched in its
+  // own subquery so it can use its own index:
+  //   (p.id IN (SELECT id FROM paciente WHERE nombre ILIKE $n) OR u.id IN (...))
+  // sources: [{ key, table, columns, where? }]
+  const searchIn = (term, sources) => {
+    const pattern = searchPattern(term);
+    if (!pattern) return;
+    const placeholder = param(pattern);
+    const branches = sources.map(({ key, table, columns, where }) => {
+      const match = columns
+        .map((column) => `${column} ILIKE ${placeholder}`)
+        .join(" OR ");
+      const extra = where ? ` AND ${where}` : "";
+      return `${key} IN (SELECT id FROM ${table} WHERE (${match})${extra})`;
+    });
+    add(`(${branches.join(" OR ")})`);
+  };
+
+  // Ids of the listed entity as a UNION of indexed lookups, to drive a join
+  // from the matches instead of filtering the whole join with ORs:
+  //   SELECT id FROM archivo WHERE (tipo ILIKE $n OR url ILIKE $n)
+  //   UNION SELECT archivo_id FROM archivo_asociacion
+  //         WHERE entidad = 'PACIENTE' AND entidad_id IN (SELECT id FROM paciente WHERE ...)
+  // sources: [{ table, columns, where?, via?: { table, select, key, where? } }]
+  // Returns null when there is no search term.
+  const candidateIds = (term, sources) => {
+    const pattern = searchPattern(term);
+    if (!pattern) return null;
+    const placeholder = param(pattern);
+    return sources
+      .map(({ table, columns, where, via }) => {
+        const match = columns
+          .map((column) => `${column} ILIKE ${placeholder}`)
+          .join(" OR ");
+        const extra = where ? ` AND ${where}` : "";
+        const lookup = `SELECT id FROM ${table} WHERE (${match})${extra}`;
+        if (!via) return lookup;
+        const viaExtra = via.where ? `${via.where} AND ` : "";
+        return `SELECT ${via.select} FROM ${via.table} WHERE ${viaExtra}${via.key} IN (${lookup})`;
+      })
+      .join("\n         UNION ");
+  };
+
+  const where = () =>
+    conditions.length ? `WHERE ${conditions.join("\n         AND ")}` : "";
+
+  return { params, param, add, search, searchIn, candidateIds, where };
+};
+
+module.exports = { createFilter, escapeLike };
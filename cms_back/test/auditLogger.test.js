@@ -0,0 +1,42 @@
+const { test } = require("node:test");
+const assert = require("node:assert");
+const path = require("path");
+
+// config/database needs pg and a real server; the logger only uses query()
+const inserted = [];
+const statements = [];
+require.cache[path.resolve(__dirname, "../src/config/database.js")] = {
+  exports: {
+    query: async (text, params) => {
+      inserted.push(params.length / 6);
+      statements.push({ text, params });
+      return { rows: [] };
+    },
+  },
+};
+
+const { logAudit, flushAudit, getAuditMetrics } = require("../src/utils/auditLogger");
+
+test("flushing an empty queue does not block later flushes", async () => {
+  await flushAudit();
+
+  for (let i = 0; i < 5; i += 1) {
+    await logAudit(1, "CREATE", "CITA", i);
+  }
+  await flushAudit();
+
+  const { audit } = getAuditMetrics();
+  assert.strictEqual(audit.pending, 0);
+  assert.strictEqual(audit.flushed, 5);
+  assert.deepStrictEqual(inserted, [5]);
+});
+
+test("fecha_hora is sent as an ISO instant cast to timestamptz", async () => {
+  statements.length = 0;
+  await logAudit(1, "UPDATE", "CITA", 9);
+  await flushAudit();
+
+  const [{ text, params }] = statements;
+  assert.match(text, /\(\$1, \$2, \$3, \$4, \$5, \$6::timestamptz\)/);
+  assert.match(params[5], /^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z$/);
+});
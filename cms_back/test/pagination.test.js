@@ -0,0 +1,54 @@
+const { test } = require("node:test");
+const assert = require("node:assert");
+const path = require("path");
+
+// parsePagination never queries; config/database would need pg
+require.cache[path.resolve(__dirname, "../src/config/database.js")] = {
+  exports: { query: async () => ({ rows: [] }) },
+};
+
+const { parsePagination } = require("../src/utils/pagination");
+
+const cursorOf = (values) =>
+  Buffer.from(JSON.stringify(values)).toString("base64url");
+
+const parse = (values, keyset) =>
+  parsePagination({ cursor: cursorOf(values) }, keyset);
+
+test("accepts cursors that match the keyset", () => {
+  const page = parse(["2024-05-01 09:30:00.123456-06", 42], ["timestamp", "int"]);
+  assert.strictEqual(page.mode, "cursor");
+  assert.deepStrictEqual(page.after, ["2024-05-01 09:30:00.123456-06", 42]);
+
+  assert.deepStrictEqual(parse(["O+", 3], ["text", "int"]).after, ["O+", 3]);
+  assert.deepStrictEqual(
+    parse(["2024-05-01 09:30:00+00", 7, 0], ["timestamp", "int", "int"]).after,
+    ["2024-05-01 09:30:00+00", 7, 0]
+  );
+});
+
+test("rejects cursors with the wrong element count or types with 400", () => {
+  const invalid = [
+    [["abc", 1], ["timestamp", "int"]],
+    [["2024-02-31 10:00:00+00", 1], ["timestamp", "int"]],
+    [["2024-05-01 09:30:00+00", "1"], ["timestamp", "int"]],
+    [["2024-05-01 09:30:00+00", 1.5], ["timestamp", "int"]],
+    [["2024-05-01 09:30:00+00", 2 ** 31], ["timestamp", "int"]],
+    [["2024-05-01 09:30:00+00"], ["timestamp", "int"]],
+    [["2024-05-01 09:30:00+00", 1], ["timestamp", "int", "int"]],
+    [[null, 1], ["text", "int"]],
+    [{ id: 1 }, ["text", "int"]],
+  ];
+
+  for (const [values, keyset] of invalid) {
+    assert.throws(
+      () => parse(values, keyset),
+      (error) => error.status === 400 && error.message === "Invalid cursor",
+      JSON.stringify(values)
+    );
+  }
+  assert.throws(
+    () => parsePagination({ cursor: "not-json" }, ["text", "int"]),
+    { message: "Invalid cursor" }
+  );
+});
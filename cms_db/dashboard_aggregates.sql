@@ -0,0 +1,209 @@
+-- ===========================================
+-- AGREGADOS PRECALCULADOS PARA EL DASHBOARD
+-- ===========================================
+-- Evita los COUNT(*) y agregados sobre toda CONSULTA en cada request:
+--   * DASHBOARD_CONTADOR + DASHBOARD_CONTADOR_DELTA: totales de CONSULTA,
+--     PACIENTE y MEDICO. Triggers por sentencia (con tablas de transición)
+--     insertan una fila delta por INSERT/DELETE en vez de actualizar una
+--     fila compartida, así los escritores concurrentes no se bloquean entre
+--     sí. El total es la base más la suma de deltas; el refresco periódico
+--     compacta los deltas en la base. TRUNCATE pone el contador en cero.
+--   * Vistas materializadas para las gráficas, refrescadas por el
+--     backend cada DASHBOARD_REFRESH_INTERVAL_MS con
+--     refresh_dashboard_aggregates().
+-- Es idempotente: se puede correr de nuevo sobre una base existente.
+
+-- ===========================================
+-- CONTADORES MANTENIDOS POR TRIGGERS
+-- ===========================================
+
+CREATE TABLE IF NOT EXISTS DASHBOARD_CONTADOR (
+    entidad VARCHAR(30) PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0
+);
+
+-- Solo INSERTs: cada transacción escribe su propia fila, sin lock compartido
+CREATE TABLE IF NOT EXISTS DASHBOARD_CONTADOR_DELTA (
+    id BIGSERIAL PRIMARY KEY,
+    entidad VARCHAR(30) NOT NULL,
+    delta BIGINT NOT NULL
+);
+
+-- Versión anterior: trigger por fila que actualizaba DASHBOARD_CONTADOR
+DROP TRIGGER IF EXISTS trg_dashboard_consulta ON CONSULTA;
+DROP TRIGGER IF EXISTS trg_dashboard_paciente ON PACIENTE;
+DROP TRIGGER IF EXISTS trg_dashboard_medico ON MEDICO;
+DROP FUNCTION IF EXISTS dashboard_counter_trigger();
+
+CREATE OR REPLACE FUNCTION dashboard_counter_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO DASHBOARD_CONTADOR_DELTA (entidad, delta)
+    SELECT TG_TABLE_NAME, COUNT(*) FROM filas_nuevas HAVING COUNT(*) > 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION dashboard_counter_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO DASHBOARD_CONTADOR_DELTA (entidad, delta)
+    SELECT TG_TABLE_NAME, -COUNT(*) FROM filas_borradas HAVING COUNT(*) > 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TRUNCATE toma un lock exclusivo de la tabla: no hay escritores en paralelo
+CREATE OR REPLACE FUNCTION dashboard_counter_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM DASHBOARD_CONTADOR_DELTA WHERE entidad = TG_TABLE_NAME;
+    UPDATE DASHBOARD_CONTADOR SET total = 0 WHERE entidad = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tabla TEXT;
+BEGIN
+    FOREACH tabla IN ARRAY ARRAY['consulta', 'paciente', 'medico'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_dashboard_%s_ins ON %I', tabla, tabla);
+        EXECUTE format(
+            'CREATE TRIGGER trg_dashboard_%s_ins AFTER INSERT ON %I '
+            'REFERENCING NEW TABLE AS filas_nuevas '
+            'FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counter_insert()',
+            tabla, tabla);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_dashboard_%s_del ON %I', tabla, tabla);
+        EXECUTE format(
+            'CREATE TRIGGER trg_dashboard_%s_del AFTER DELETE ON %I '
+            'REFERENCING OLD TABLE AS filas_borradas '
+            'FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counter_delete()',
+            tabla, tabla);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_dashboard_%s_trunc ON %I', tabla, tabla);
+        EXECUTE format(
+            'CREATE TRIGGER trg_dashboard_%s_trunc AFTER TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counter_truncate()',
+            tabla, tabla);
+    END LOOP;
+END;
+$$;
+
+-- Total actual de cada entidad (lo lee el backend)
+CREATE OR REPLACE VIEW v_dashboard_contador AS
+SELECT c.entidad, c.total + COALESCE(SUM(d.delta), 0) AS total
+FROM DASHBOARD_CONTADOR c
+LEFT JOIN DASHBOARD_CONTADOR_DELTA d ON d.entidad = c.entidad
+GROUP BY c.entidad, c.total;
+
+-- Pasa los deltas ya confirmados a la base en una sola sentencia: quien lea
+-- ve la base vieja con sus deltas o la base nueva sin ellos
+CREATE OR REPLACE FUNCTION compact_dashboard_counters()
+RETURNS VOID AS $$
+BEGIN
+    WITH movidos AS (
+        DELETE FROM DASHBOARD_CONTADOR_DELTA RETURNING entidad, delta
+    )
+    UPDATE DASHBOARD_CONTADOR c
+    SET total = c.total + m.delta
+    FROM (SELECT entidad, SUM(delta) AS delta FROM movidos GROUP BY entidad) m
+    WHERE c.entidad = m.entidad;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recalcula desde las tablas (instalación y cargas masivas con triggers
+-- apagados). TG_TABLE_NAME llega en minúsculas.
+CREATE OR REPLACE FUNCTION sync_dashboard_counters()
+RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE CONSULTA, PACIENTE, MEDICO IN SHARE MODE;
+    DELETE FROM DASHBOARD_CONTADOR_DELTA;
+    INSERT INTO DASHBOARD_CONTADOR (entidad, total)
+    SELECT 'consulta', COUNT(*) FROM CONSULTA
+    UNION ALL SELECT 'paciente', COUNT(*) FROM PACIENTE
+    UNION ALL SELECT 'medico', COUNT(*) FROM MEDICO
+    ON CONFLICT (entidad) DO UPDATE SET total = EXCLUDED.total;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT sync_dashboard_counters();
+
+-- ===========================================
+-- VISTAS MATERIALIZADAS DE LAS GRÁFICAS
+-- ===========================================
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_dashboard_consultas_estado AS
+SELECT ec.nombre AS estado, COUNT(*) AS total
+FROM CONSULTA c
+JOIN ESTADO_CONSULTA ec ON c.id_estado_consulta = ec.id
+GROUP BY 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_dashboard_consultas_estado
+ON mv_dashboard_consultas_estado(estado);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_dashboard_actividad AS
+SELECT 'Consultas' AS entidad, COUNT(*) AS total
+FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days'
+UNION ALL
+SELECT 'Pacientes' AS entidad, COUNT(DISTINCT id_paciente) AS total
+FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days'
+UNION ALL
+SELECT 'Médicos' AS entidad, COUNT(DISTINCT id_medico) AS total
+FROM CONSULTA WHERE fecha_hora > CURRENT_DATE - INTERVAL '30 days';
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_dashboard_actividad
+ON mv_dashboard_actividad(entidad);
+
+-- Conteo mensual de los últimos 24 meses; el acumulado se calcula al leer
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_dashboard_consultas_mes AS
+SELECT to_char(fecha_hora, 'YYYY-MM') AS mes, COUNT(*) AS cnt
+FROM CONSULTA
+WHERE fecha_hora > CURRENT_DATE - INTERVAL '24 months'
+GROUP BY 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_dashboard_consultas_mes
+ON mv_dashboard_consultas_mes(mes);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_dashboard_top_medicos AS
+SELECT m.id AS medico_id, m.nombre AS medico, COUNT(*) AS total
+FROM CONSULTA c
+LEFT JOIN CITA ci ON c.cita_id = ci.id
+LEFT JOIN MEDICO m ON (ci.medico_id = m.id OR c.id_medico = m.id)
+WHERE m.id IS NOT NULL
+GROUP BY 1, 2;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_dashboard_top_medicos
+ON mv_dashboard_top_medicos(medico_id);
+
+-- ===========================================
+-- REFRESCO
+-- ===========================================
+
+CREATE TABLE IF NOT EXISTS DASHBOARD_REFRESCO (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    refrescado_en TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO DASHBOARD_REFRESCO (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+-- CONCURRENTLY deja leer las vistas mientras se recalculan. Si otra
+-- instancia del backend ya está refrescando, no se repite el trabajo.
+CREATE OR REPLACE FUNCTION refresh_dashboard_aggregates()
+RETURNS TIMESTAMPTZ AS $$
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('refresh_dashboard_aggregates')) THEN
+        RETURN (SELECT refrescado_en FROM DASHBOARD_REFRESCO WHERE id = 1);
+    END IF;
+
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_dashboard_consultas_estado;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_dashboard_actividad;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_dashboard_consultas_mes;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_dashboard_top_medicos;
+    PERFORM compact_dashboard_counters();
+
+    UPDATE DASHBOARD_REFRESCO SET refrescado_en = NOW() WHERE id = 1;
+    RETURN NOW();
+END;
+$$ LANGUAGE plpgsql;
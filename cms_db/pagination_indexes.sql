@@ -0,0 +1,25 @@
+-- ===========================================
+-- ÍNDICES PARA PAGINACIÓN POR CURSOR (KEYSET)
+-- ===========================================
+-- Los listados con ?pagination=cursor ordenan por (fecha, id) y filtran
+-- con (fecha, id) < (cursor). Con estos índices cada página es un
+-- recorrido corto del índice, sin importar qué tan profunda sea.
+-- Es idempotente: se puede correr de nuevo sobre una base existente.
+
+CREATE INDEX IF NOT EXISTS idx_cita_fecha_id
+ON CITA(fecha_inicio DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_consulta_fecha_id
+ON CONSULTA(fecha_hora DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_auditoria_fecha_id
+ON AUDITORIA(fecha_hora DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_archivo_creado_id
+ON ARCHIVO(creado_en DESC, id DESC);
+
+-- Actualiza las estadísticas que usa ?total=estimate
+ANALYZE CITA;
+ANALYZE CONSULTA;
+ANALYZE AUDITORIA;
+ANALYZE ARCHIVO;
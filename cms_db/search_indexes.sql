@@ -0,0 +1,51 @@
+-- ===========================================
+-- ÍNDICES DE BÚSQUEDA (pg_trgm)
+-- ===========================================
+-- Los filtros ?search usan "columna ILIKE '%texto%'" (ver
+-- cms_back/src/utils/search.js). Un índice B-tree no sirve para un
+-- patrón con % al inicio; un índice GIN de trigramas sí, a partir de
+-- 3 caracteres. Los catálogos son tablas pequeñas y no lo necesitan.
+-- Es idempotente: se puede correr de nuevo sobre una base existente.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Usuarios (listado de usuarios, pacientes y médicos)
+CREATE INDEX IF NOT EXISTS idx_usuario_username_trgm
+ON USUARIO USING GIN (username gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_usuario_correo_trgm
+ON USUARIO USING GIN (correo gin_trgm_ops);
+
+-- Pacientes
+CREATE INDEX IF NOT EXISTS idx_paciente_nombre_trgm
+ON PACIENTE USING GIN (nombre gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_paciente_correo_trgm
+ON PACIENTE USING GIN (correo gin_trgm_ops);
+
+-- Médicos
+CREATE INDEX IF NOT EXISTS idx_medico_nombre_trgm
+ON MEDICO USING GIN (nombre gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_medico_cedula_trgm
+ON MEDICO USING GIN (cedula gin_trgm_ops);
+
+-- Archivos
+CREATE INDEX IF NOT EXISTS idx_archivo_tipo_trgm
+ON ARCHIVO USING GIN (tipo gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_archivo_url_trgm
+ON ARCHIVO USING GIN (url gin_trgm_ops);
+
+-- Auditoría (filtros entidad y accion)
+CREATE INDEX IF NOT EXISTS idx_auditoria_entidad_trgm
+ON AUDITORIA USING GIN (entidad gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_auditoria_accion_trgm
+ON AUDITORIA USING GIN (accion gin_trgm_ops);
+
+ANALYZE USUARIO;
+ANALYZE PACIENTE;
+ANALYZE MEDICO;
+ANALYZE ARCHIVO;
+ANALYZE AUDITORIA;